@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Browser Pool
+Keeps warm Chrome drivers alive across crawls and extractor threads so each
+caller doesn't pay the Chrome cold start.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+class BrowserPool:
+    """Bounded LIFO pool of live browser drivers."""
+
+    def __init__(self, factory: Callable, maxsize: int = 5, reset: Optional[Callable] = None,
+                 refill: bool = False):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Zero-argument callable that launches a new driver
+            maxsize: Maximum number of live drivers (idle, checked out or launching)
+            reset: Optional callable run on a driver before it goes back to the idle
+                queue (e.g. clearing cookies) so tasks don't share state
+            refill: Launch a replacement in the background whenever a driver is
+                discarded, so the next acquire() finds a warm one
+        """
+        self.factory = factory
+        self.maxsize = maxsize
+        self.reset = reset
+        self.refill = refill
+        self._slots = threading.Semaphore(maxsize)
+        # LIFO so the most recently used (warmest) driver is handed out first
+        self._idle = queue.LifoQueue()
+        # Drivers launched (or being launched) and not yet quit; guarded by _lock,
+        # which also orders idle-queue puts against close()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        """Check if driver is still alive and responsive."""
+        try:
+            # Try to get current URL - this will fail if driver is dead
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        """Quit a pool driver and free its place under maxsize."""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._live -= 1
+
+    def _reserve(self, count: int = 1) -> int:
+        """Claim up to count launches without exceeding maxsize live drivers; returns how many."""
+        with self._lock:
+            if self._closed:
+                return 0
+            count = max(0, min(count, self.maxsize - self._live))
+            self._live += count
+            return count
+
+    def _launch(self):
+        """Run the factory for a launch already counted by _reserve()."""
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+
+    def _put_idle(self, driver):
+        """Queue driver for reuse, or quit it if the pool has been closed."""
+        with self._lock:
+            if not self._closed:
+                self._idle.put(driver)
+                return
+        self._quit(driver)
+
+    def acquire(self):
+        """
+        Check out a driver, reusing an idle one when possible.
+
+        Blocks while maxsize drivers are already checked out, or while every
+        live driver is in use and a replacement is still launching.
+        """
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    if self._reserve():
+                        return self._launch()
+                    # At maxsize: a background refill is on its way to the idle queue
+                    try:
+                        driver = self._idle.get(timeout=1)
+                    except queue.Empty:
+                        continue
+                if self._is_alive(driver):
+                    return driver
+                self._quit(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, discard: bool = False):
+        """
+        Return a driver to the pool.
+
+        Args:
+            driver: Driver previously returned by acquire()
+            discard: Quit the driver instead of keeping it (e.g. after an error)
+        """
+        try:
+            if driver is not None:
+                # One liveness check (a round-trip to the browser) per release
+                if not discard and not self._is_alive(driver):
+                    discard = True
+                if not discard and self.reset is not None:
+                    try:
+                        self.reset(driver)
+                    except Exception:
+                        discard = True
+                if discard:
+                    self._quit(driver)
+                    if self.refill and self._reserve():
+                        threading.Thread(target=self._add_idle_driver, daemon=True).start()
+                else:
+                    self._put_idle(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def checkout(self):
+        """Acquire a driver for the duration of a with-block, discarding it if the block fails."""
+        driver = self.acquire()
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, discard=failed)
+
+    def _add_idle_driver(self):
+        """Launch one driver (already reserved) straight into the idle queue."""
+        try:
+            driver = self._launch()
+        except Exception as e:
+            print(f"Warning: Could not launch pooled browser: {e}")
+            return
+        self._put_idle(driver)
+
+    def prefill(self, count: int):
+        """Launch up to count idle drivers in parallel, so the first tasks start warm."""
+        count = self._reserve(min(count, self.maxsize) - self._idle.qsize())
+        threads = [threading.Thread(target=self._add_idle_driver, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        """
+        Quit every idle driver.
+
+        Drivers still launching in the background, or released later, are quit
+        instead of being queued.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
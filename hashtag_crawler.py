@@ -4,628 +4,1279 @@ TikTok Hashtag Crawler - Using Undetected ChromeDriver
 This version uses undetected-chromedriver which is designed to bypass bot detection.
 """
 
+import gzip
+import hashlib
+import heapq
+import importlib.util
 import json
+import logging
+import os
 import time
 import re
-from typing import Set, List
+import threading
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+from typing import Dict, Set, List, Union
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
+from urllib3.util.retry import Retry
+
+log = logging.getLogger(__name__)
 
 try:
-    import undetected_chromedriver as uc
-    from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
-    SELENIUM_AVAILABLE = True
+    from selenium.common.exceptions import TimeoutException
+    # undetected_chromedriver is slow to import, so only check it's installed
+    # here; _uc() imports it on the first browser launch
+    SELENIUM_AVAILABLE = importlib.util.find_spec('undetected_chromedriver') is not None
 except ImportError:
     SELENIUM_AVAILABLE = False
+if not SELENIUM_AVAILABLE:
     print("Note: undetected-chromedriver not installed. Install with: pip install undetected-chromedriver selenium")
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=1)
+def _uc():
+    """The undetected_chromedriver module, imported on first use."""
+    import undetected_chromedriver as uc
+    return uc
+
+
+# Shared HTTP session for the API fallback: keeps TLS connections to tiktok.com alive
+# across calls and retries transient rate-limit / server errors
+_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+_SESSION.headers.update(_API_HEADERS)
+
+# Conditional-fetch cache for API responses (ETag / Last-Modified + body per key)
+_HTTP_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'tiktok_crawler')
+
+
+def _http_cache_path(key: str) -> str:
+    """Cache file for key; hashed so user-supplied hashtags can't escape the cache dir."""
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(_HTTP_CACHE_DIR, f"{digest}.json")
+
+
+# Resolved {hashtag: challenge_id} map, so warm runs skip the challenge-detail call
+_CHALLENGE_ID_CACHE = os.path.join(_HTTP_CACHE_DIR, 'challenge_ids.json')
+_challenge_id_lock = threading.Lock()
+
+
+def _load_challenge_ids() -> Dict[str, str]:
+    """Load the cached hashtag -> challenge ID map (empty if missing or unreadable)."""
+    try:
+        with open(_CHALLENGE_ID_CACHE, 'r', encoding='utf-8') as f:
+            ids = json.load(f)
+        return ids if isinstance(ids, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_challenge_id(hashtag: str, challenge_id: str):
+    """Record a resolved challenge ID in the on-disk cache."""
+    with _challenge_id_lock:
+        ids = _load_challenge_ids()
+        ids[hashtag] = challenge_id
+        try:
+            os.makedirs(_HTTP_CACHE_DIR, exist_ok=True)
+            temp_file = _CHALLENGE_ID_CACHE + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(ids, f)
+            os.replace(temp_file, _CHALLENGE_ID_CACHE)
+        except OSError as e:
+            print(f"Warning: Could not write challenge ID cache: {e}")
+
+
+def _conditional_get(url: str, cache_key: str, **kwargs):
+    """
+    GET url through the shared session, revalidating against the cached copy.
+    
+    Sends If-None-Match / If-Modified-Since from the last response for cache_key
+    and returns the cached body on 304 Not Modified.
+    
+    Returns:
+        Response body text, or None if the request did not succeed
+    """
+    cache_path = _http_cache_path(cache_key)
+    cached = None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    headers = dict(kwargs.pop('headers', None) or {})
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    response = _SESSION.get(url, headers=headers, **kwargs)
+    if response.status_code == 304 and cached:
+        print(f"Not modified, using cached response for {cache_key}")
+        return cached.get('body')
+    if response.status_code != 200:
+        return None
+    
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        try:
+            os.makedirs(_HTTP_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': etag, 'last_modified': last_modified, 'body': response.text}, f)
+        except OSError as e:
+            print(f"Warning: Could not write HTTP cache: {e}")
+    return response.text
+
+
+# Crawler output JSON above this size is written gzip-compressed (URL lists compress well)
+_GZIP_THRESHOLD = 1 << 20
+
+
+def _remove_quietly(path: str):
+    """Delete path if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Warning: Could not remove stale output {path}: {e}")
+
+
+def _holds_payload(path: str, size: int, obj, ignore_keys) -> bool:
+    """Whether path already holds obj (size bytes once written), not counting ignore_keys."""
+    try:
+        # Fixed-width fields like timestamps keep unchanged data at the same size
+        if not path.endswith('.gz') and os.path.getsize(path) != size:
+            return False
+        with open(path, 'rb') as f:
+            existing = f.read()
+        if path.endswith('.gz'):
+            existing = gzip.decompress(existing)
+        existing = orjson.loads(existing) if ORJSON_AVAILABLE else json.loads(existing)
+    except (OSError, EOFError, ValueError):
+        return False  # Missing, unreadable or not JSON
+    if not isinstance(obj, dict) or not isinstance(existing, dict):
+        return existing == obj
+    return ({k: v for k, v in existing.items() if k not in ignore_keys}
+            == {k: v for k, v in obj.items() if k not in ignore_keys})
+
+
+def _dump_json(obj, path: str, gzip_threshold: int = _GZIP_THRESHOLD, ignore_keys=()) -> str:
+    """
+    Atomically write obj as indented UTF-8 JSON, using orjson's native encoder when available.
+    
+    Output larger than gzip_threshold bytes is gzip-compressed to path + '.gz';
+    whichever of path / path + '.gz' isn't used is removed, so a stale copy from
+    an earlier run can't be read instead. Skips the write when the file already holds the same data, apart from the
+    top-level ignore_keys (e.g. a run timestamp), which then keep their old values.
+    
+    Returns:
+        Path of the file that holds the result
+    """
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    stale_path = path + '.gz'
+    if len(data) > gzip_threshold:
+        path, stale_path = stale_path, path
+        # mtime=0 keeps the bytes identical for identical data
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+    
+    if _holds_payload(path, len(data), obj, ignore_keys):
+        _remove_quietly(stale_path)
+        return path
+    
+    # Use atomic write: write to temp file first, then rename
+    temp_file = path + '.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, path)
+        _remove_quietly(stale_path)
+        return path
+    except Exception:
+        # Clean up temp file on error
+        try:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+
+
+# Numeric video ID inside a video URL; collected links are keyed by it
+_VIDEO_ID_IN_URL = re.compile(r'/video/(\d+)')
+
+# Every URL built by extract_video_ids_from_text starts with this prefix
+_CANONICAL_URL_PREFIX = 'https://www.tiktok.com/'
+
+# Early stop for the scroll loop: average new videos per scroll over the last
+# _YIELD_WINDOW scrolls must stay at or above _MIN_YIELD_PER_SCROLL
+_YIELD_WINDOW = 10
+_MIN_YIELD_PER_SCROLL = 0.2
+
+# Returns every video link href in the live DOM
+_JS_EXTRACT = "return Array.from(document.querySelectorAll('a[href*=\"/video/\"]')).map(a => a.href);"
+
+# Number of video link anchors in the live DOM (no WebElement references sent back)
+_JS_COUNT_VIDEO_LINKS = "return document.querySelectorAll('a[href*=\"/video/\"]').length;"
+
+# Returns the text of a visible "Something went wrong" paragraph in <main>, or null.
+# Done in one script call instead of find_elements + is_displayed + text round trips.
+_JS_FIND_ERROR_MESSAGE = """
+    for (const p of document.querySelectorAll('main p')) {
+        if (p.offsetParent !== null && /something went wrong/i.test(p.innerText)) {
+            return p.innerText.trim();
+        }
+    }
+    return null;
+"""
+
+# Clicks the first visible Refresh / Try again / Reload button or link.
+# Returns true if one was clicked.
+_JS_CLICK_REFRESH_BUTTON = """
+    for (const el of document.querySelectorAll('button, a')) {
+        if (el.offsetParent === null) {
+            continue;
+        }
+        if (el.getAttribute('data-e2e') === 'refresh-button'
+                || /refresh|try again|reload/i.test(el.innerText)) {
+            el.click();
+            return true;
+        }
+    }
+    return false;
+"""
+
+# Installed via CDP so it runs before any page script: hides webdriver and headless tells
+_STEALTH_JS = """
+    // Override visibility and focus detection
+    Object.defineProperty(document, 'hidden', { 
+        get: () => false,
+        configurable: true
+    });
+    Object.defineProperty(document, 'visibilityState', { 
+        get: () => 'visible',
+        configurable: true
+    });
+    Object.defineProperty(document, 'hasFocus', {
+        value: () => true,
+        configurable: true
+    });
+    
+    // Remove webdriver flag
+    Object.defineProperty(navigator, 'webdriver', { 
+        get: () => undefined,
+        configurable: true
+    });
+    
+    // Add chrome object
+    window.chrome = { 
+        runtime: {},
+        loadTimes: function() {},
+        csi: function() {},
+        app: {}
+    };
+    
+    // Add plugins
+    Object.defineProperty(navigator, 'plugins', { 
+        get: () => [1, 2, 3, 4, 5],
+        configurable: true
+    });
+    
+    // Add languages
+    Object.defineProperty(navigator, 'languages', { 
+        get: () => ['en-US', 'en'],
+        configurable: true
+    });
+    
+    // Simulate focus events
+    window.addEventListener('focus', () => {}, true);
+    window.addEventListener('blur', () => {}, true);
+    
+    // Dispatch focus event
+    window.dispatchEvent(new Event('focus'));
+    document.dispatchEvent(new Event('visibilitychange'));
+"""
+
+# Focus the window before loading in headless mode
+_FOCUS_JS = 'window.focus(); document.hasFocus = () => true;'
+
+# Simulated user presence (focus, mouse movement, scroll) for headless mode
+_INTERACTION_JS = """
+    // Simulate focus
+    window.dispatchEvent(new Event('focus', { bubbles: true }));
+    document.dispatchEvent(new Event('visibilitychange', { bubbles: true }));
+    
+    // Simulate mouse movement
+    document.dispatchEvent(new MouseEvent('mousemove', {
+        bubbles: true,
+        cancelable: true,
+        view: window,
+        clientX: 100,
+        clientY: 100
+    }));
+    
+    // Simulate scroll
+    window.dispatchEvent(new Event('scroll', { bubbles: true }));
+    
+    // Ensure document appears focused
+    if (document.hasFocus) {
+        Object.defineProperty(document, 'hasFocus', {
+            value: () => true,
+            writable: false
+        });
+    }
+"""
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of a and b (binary search over C-level slice compares)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+# Regex patterns used by extract_video_ids_from_text, compiled once at import
+# since the extractor runs on the full page source after every scroll.
+# Patterns are bytes: the URL grammar is ASCII, and scanning UTF-8 bytes moves
+# far less memory than scanning a (UCS-4) str.
+
+# Pattern 1: Full URLs with username (most preferred)
+# https://www.tiktok.com/@username/video/1234567890
+# One pattern covers plain, quoted ("url"/"shareUrl"), href and protocol-less forms
+_FULL_URL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    rb'(?:https?://)?(?:www\.|m\.|vm\.)?tiktok\.com/@([^/\s"\'<>]+)/video/(\d{9,})',
+    # Also match without host - anchored to a delimiter with a bounded username
+    # class so it does not backtrack from every '@' in the page
+    rb'(?:^|[\s"\'<>])@([A-Za-z0-9._]{1,24})/video/(\d{9,})',
+]]
+
+# Pattern 2: Structured data (JSON) that might have username + video ID in proximity.
+# The gap between the two fields is bounded so a miss cannot backtrack across
+# the whole document. These combined patterns only feed the Hyperscan prefilter;
+# extraction uses the field pairs below, with the same gap.
+_JSON_PAIR_GAP = 512  # Max bytes between the end of one field and the start of the other
+_JSON_FIELD_GAP = rb'.{0,%d}?' % _JSON_PAIR_GAP
+_JSON_PATTERNS = [re.compile(p, re.DOTALL) for p in [
+    rb'"uniqueId":\s*"([^"]+)"' + _JSON_FIELD_GAP + rb'"id":\s*"(\d{9,})"',  # Username and ID in JSON
+    rb'"id":\s*"(\d{9,})"' + _JSON_FIELD_GAP + rb'"uniqueId":\s*"([^"]+)"',  # ID and Username in JSON
+    rb'"nickname":\s*"([^"]+)"' + _JSON_FIELD_GAP + rb'"id":\s*"(\d{9,})"',  # Nickname and ID
+]]
+
+# (leading field, following field) for each entry of _JSON_PATTERNS. The leading
+# field is located with a plain scan and the following one is only matched
+# within _JSON_PAIR_GAP bytes after it, so cost stays linear in the number of hits.
+_JSON_UNIQUE_ID_FIELD = re.compile(rb'"uniqueId":\s*"([^"]+)"')
+_JSON_ID_FIELD = re.compile(rb'"id":\s*"(\d{9,})"')
+_JSON_NICKNAME_FIELD = re.compile(rb'"nickname":\s*"([^"]+)"')
+
+
+def _after_gap(field):
+    """field, allowed to start up to _JSON_PAIR_GAP bytes after the match position."""
+    return re.compile(_JSON_FIELD_GAP + field.pattern, re.DOTALL)
+
+
+_JSON_FIELD_PAIRS = [
+    (_JSON_UNIQUE_ID_FIELD, _after_gap(_JSON_ID_FIELD)),
+    (_JSON_ID_FIELD, _after_gap(_JSON_UNIQUE_ID_FIELD)),
+    (_JSON_NICKNAME_FIELD, _after_gap(_JSON_ID_FIELD)),
+]
+
+# Upper bound on one matched field or URL: usernames are at most 24 characters
+# and nicknames 30, so even fully escaped they stay well below this
+_MAX_FIELD_SPAN = 256
+
+# Overlap kept when re-scanning only the changed part of the page source.
+# Covers the widest match: two JSON fields plus the gap allowed between them
+_INCREMENTAL_SCAN_OVERLAP = _JSON_PAIR_GAP + 2 * _MAX_FIELD_SPAN
+
+# Pattern 3: Video IDs only (fallback)
+_VIDEO_ID_PATTERNS = [re.compile(p) for p in [
+    rb'/video/(\d{9,})',
+    rb'"videoId":"(\d{9,})"',
+    rb'"id":"(\d{9,})"',
+    rb'video_id["\']?\s*:\s*["\']?(\d{9,})',
+    rb'"aweme_id":"(\d{9,})"',
+]]
+
+_ALL_PATTERNS = _FULL_URL_PATTERNS + _JSON_PATTERNS + _VIDEO_ID_PATTERNS
+
+
+def _build_pattern_database():
+    """Compile every extraction pattern into one Hyperscan database (None if unavailable)."""
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    flags = []
+    for pattern in _ALL_PATTERNS:
+        # Only need to know whether a pattern matches at all - re extracts the groups
+        hs_flags = hyperscan.HS_FLAG_SINGLEMATCH
+        if pattern.flags & re.IGNORECASE:
+            hs_flags |= hyperscan.HS_FLAG_CASELESS
+        if pattern.flags & re.DOTALL:
+            hs_flags |= hyperscan.HS_FLAG_DOTALL
+        flags.append(hs_flags)
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.pattern for p in _ALL_PATTERNS],
+            ids=list(range(len(_ALL_PATTERNS))),
+            elements=len(_ALL_PATTERNS),
+            flags=flags,
+        )
+        return db
+    except Exception as e:
+        print(f"Warning: Could not compile Hyperscan database, using re only: {e}")
+        return None
+
+
+_PATTERN_DB = _build_pattern_database()
+
+# Literal substrings every pattern in a family needs in order to match.
+# Checked with plain `in` (memchr-backed) before any regex work is done.
+_PATTERN_GROUP_ANCHORS = {
+    'full_url': (b'/video/',),
+    'json': (b'"uniqueId"', b'"nickname"'),
+    'video_id': (b'/video/', b'"videoId"', b'"id"', b'video_id', b'"aweme_id"'),
+}
+
+def _triggered_pattern_groups(text: bytes) -> Set[str]:
+    """Return the pattern families whose literal anchor appears in text."""
+    return {
+        group
+        for group, anchors in _PATTERN_GROUP_ANCHORS.items()
+        if any(anchor in text for anchor in anchors)
+    }
+
+
+def _scan_matching_patterns(text: bytes):
+    """
+    Single linear scan over text reporting which extraction patterns match.
+    
+    Returns a set of pattern indexes into _ALL_PATTERNS, or None when Hyperscan
+    is not available (caller should then try every pattern).
+    """
+    if _PATTERN_DB is None:
+        return None
+    matched = set()
+    
+    def on_match(pattern_id, from_offset, to_offset, flags, context):
+        matched.add(pattern_id)
+    
+    try:
+        _PATTERN_DB.scan(text, match_event_handler=on_match)
+    except Exception:
+        return None
+    return matched
+
+
+def _walk_for_videos(obj) -> Set[str]:
+    """
+    Collect video URLs from a parsed TikTok state object (SIGI_STATE /
+    __UNIVERSAL_DATA_FOR_REHYDRATION__) by walking its dicts and lists.
+    
+    A dict counts as a video item when it has an `aweme_id`, or an `id`
+    alongside an `author`/`video` field. The username comes from
+    `author.uniqueId`, a plain-string `author`, or `uniqueId`.
+    """
+    video_urls = set()
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+        if not isinstance(current, dict):
+            continue
+        
+        video_id = current.get('aweme_id')
+        if video_id is None and ('author' in current or 'video' in current):
+            video_id = current.get('id')
+        video_id = str(video_id) if video_id is not None else ''
+        
+        if video_id.isdigit() and len(video_id) > 8:
+            author = current.get('author')
+            if isinstance(author, dict):
+                username = author.get('uniqueId')
+            elif isinstance(author, str):
+                username = author
+            else:
+                username = current.get('uniqueId')
+            
+            if isinstance(username, str) and username and '/' not in username:
+                video_urls.add(f"https://www.tiktok.com/@{username}/video/{video_id}")
+            else:
+                video_urls.add(f"https://www.tiktok.com/video/{video_id}")
+        
+        stack.extend(v for v in current.values() if isinstance(v, (dict, list)))
+    return video_urls
+
 
 class HashtagCrawler:
     """TikTok crawler using undetected-chromedriver."""
     
-    def __init__(self, headless: bool = False, auto_fallback: bool = True):
+    # Username and video ID of a full video URL, compiled once for normalize_url
+    _URL_RE = re.compile(r'https?://(?:www\.|m\.)?tiktok\.com/@([^/?#]+)/video/(\d+)')
+    
+    def __init__(self, headless: bool = False, auto_fallback: bool = True, pool=None):
         """
         Initialize the crawler.
         
         Args:
             headless: Run browser in headless mode
             auto_fallback: Automatically fall back to non-headless if headless fails
+            pool: Optional BrowserPool of crawler drivers (built from another crawler's
+                _create_driver) to borrow warm drivers from instead of launching one
         """
         self.headless = headless
         self.auto_fallback = auto_fallback
+        self.pool = pool
         self.driver = None
-        self.video_links: Set[str] = set()
+        self.video_links: Dict[int, str] = {}  # Video ID -> URL
         self.original_headless = headless  # Remember original setting
+        self._prev_page_source = ''  # Last page source scanned in the scroll loop
         
-    def extract_video_ids_from_text(self, text: str) -> Set[str]:
-        """Extract full video URLs (with username) from text content."""
+    def extract_video_ids_from_text(self, text: Union[str, bytes]) -> Set[str]:
+        """Extract full video URLs (with username) from text content (str or UTF-8 bytes)."""
         video_urls = set()
+        if isinstance(text, str):
+            # Encode once - all patterns run over bytes
+            text = text.encode('utf-8', 'ignore')
+        known_ids = set()  # Video IDs already present in video_urls
         
-        # Pattern 1: Full URLs with username (most preferred)
-        # https://www.tiktok.com/@username/video/1234567890
-        full_url_patterns = [
-            r'https?://(?:www\.|m\.|vm\.)?tiktok\.com/@([^/\s"\'<>]+)/video/(\d+)',
-            r'"url":\s*"https?://(?:www\.|m\.|vm\.)?tiktok\.com/@([^/"]+)/video/(\d+)"',
-            r'"shareUrl":\s*"https?://(?:www\.|m\.|vm\.)?tiktok\.com/@([^/"]+)/video/(\d+)"',
-            r'href=["\']https?://(?:www\.|m\.|vm\.)?tiktok\.com/@([^/"\'<>]+)/video/(\d+)',
-            r'https?://(?:www\.|m\.|vm\.)?tiktok\.com/@([^/\s"\'<>]+)/video/(\d+)',
-            # Also match without protocol
-            r'tiktok\.com/@([^/\s"\'<>]+)/video/(\d+)',
-            r'@([^/\s"\'<>]+)/video/(\d+)',
-        ]
+        # Skip whole pattern families whose literal anchor is not in the text
+        groups = _triggered_pattern_groups(text)
+        if not groups:
+            return video_urls
+        
+        # One pass over the text to find which patterns can match at all
+        matched_ids = _scan_matching_patterns(text)
         
-        for pattern in full_url_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        def _active_patterns(group, patterns):
+            if group not in groups:
+                return []
+            return [
+                pattern for pattern in patterns
+                if matched_ids is None or _ALL_PATTERNS.index(pattern) in matched_ids
+            ]
+        
+        # Pattern 1: Full URLs with username (most preferred)
+        for pattern in _active_patterns('full_url', _FULL_URL_PATTERNS):
+            matches = pattern.findall(text)
             for match in matches:
                 if isinstance(match, tuple) and len(match) == 2:
-                    username, video_id = match[0].strip(), match[1].strip()
-                    if username and video_id.isdigit() and len(video_id) > 8:
+                    # Only the captured groups get decoded
+                    username = match[0].decode('utf-8', 'ignore').strip()
+                    video_id = match[1].decode('ascii').strip()
+                    if username:
                         full_url = f"https://www.tiktok.com/@{username}/video/{video_id}"
                         video_urls.add(full_url)
+                        known_ids.add(video_id)
         
         # Pattern 2: Extract from structured data (JSON) that might have username + video ID
         # Look for patterns where username and video ID are in proximity
-        json_patterns = [
-            r'"uniqueId":\s*"([^"]+)".*?"id":\s*"(\d+)"',  # Username and ID in JSON
-            r'"id":\s*"(\d+)".*?"uniqueId":\s*"([^"]+)"',  # ID and Username in JSON
-            r'"nickname":\s*"([^"]+)".*?"id":\s*"(\d+)"',  # Nickname and ID
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, text, re.DOTALL)
+        active_json_patterns = _active_patterns('json', _JSON_PATTERNS)
+        for pattern, (lead_field, follow_field) in zip(_JSON_PATTERNS, _JSON_FIELD_PAIRS):
+            if pattern not in active_json_patterns:
+                continue
+            matches = []
+            for lead in lead_field.finditer(text):
+                follow = follow_field.match(text, lead.end())
+                if follow:
+                    matches.append((lead.group(1), follow.group(1)))
             for match in matches:
                 if isinstance(match, tuple) and len(match) == 2:
-                    # Could be (username, id) or (id, username)
-                    part1, part2 = match[0].strip(), match[1].strip()
-                    
-                    # Determine which is username and which is ID
-                    if part1.isdigit() and len(part1) > 8:
+                    # Could be (username, id) or (id, username); the ID field
+                    # pattern only matches 9+ digit IDs, so its side is known
+                    part1 = match[0].decode('utf-8', 'ignore').strip()
+                    part2 = match[1].decode('utf-8', 'ignore').strip()
+                    if lead_field is _JSON_ID_FIELD:
                         video_id, username = part1, part2
-                    elif part2.isdigit() and len(part2) > 8:
-                        username, video_id = part1, part2
                     else:
-                        continue
+                        username, video_id = part1, part2
                     
                     if username and video_id and '/' not in username:  # Basic validation
                         full_url = f"https://www.tiktok.com/@{username}/video/{video_id}"
                         video_urls.add(full_url)
+                        known_ids.add(video_id)
         
         # Pattern 3: Extract video IDs only (fallback) - will create URL without username
         # This is less preferred but better than nothing
-        video_id_patterns = [
-            r'/video/(\d+)',
-            r'"videoId":"(\d+)"',
-            r'"id":"(\d+)"',
-            r'video_id["\']?\s*:\s*["\']?(\d+)',
-            r'"aweme_id":"(\d+)"',
-        ]
-        
-        for pattern in video_id_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in _active_patterns('video_id', _VIDEO_ID_PATTERNS):
+            matches = pattern.findall(text)
             for match in matches:
                 if isinstance(match, tuple):
-                    match = match[0] if match else ''
-                video_id = str(match).strip()
-                if video_id.isdigit() and len(video_id) > 8:
-                    # Only add if we don't already have this video ID in a full URL
-                    video_id_exists = any(f'/video/{video_id}' in url for url in video_urls)
-                    if not video_id_exists:
-                        # Fallback: URL without username (will be normalized later)
-                        fallback_url = f"https://www.tiktok.com/video/{video_id}"
-                        video_urls.add(fallback_url)
+                    match = match[0] if match else b''
+                video_id = match.decode('ascii').strip()
+                # Only add if we don't already have this video ID in a full URL
+                if video_id in known_ids:
+                    continue
+                # Fallback: URL without username (will be normalized later)
+                fallback_url = f"https://www.tiktok.com/video/{video_id}"
+                video_urls.add(fallback_url)
+                known_ids.add(video_id)
         
         return video_urls
     
-    def normalize_url(self, video_url: str) -> str:
+    @classmethod
+    def normalize_url(cls, video_url: str) -> str:
         """Normalize TikTok video URL."""
-        # If it's already a full URL, return as is
-        if video_url.startswith('http'):
-            return video_url
+        # Full video URL: rebuild the canonical form (drops query string / host variants)
+        match = cls._URL_RE.match(video_url)
+        if match:
+            return f"https://www.tiktok.com/@{match.group(1)}/video/{match.group(2)}"
         # If it's just a video ID, create URL without username (fallback)
         if video_url.isdigit():
             return f"https://www.tiktok.com/video/{video_url}"
-        return video_url
+        return video_url.split('?', 1)[0].rstrip('/')
+    
+    def _add_video_links(self, video_urls) -> int:
+        """
+        Merge a batch of video URLs, deduplicating by their numeric video ID.
+        
+        Returns:
+            Number of video IDs that were not seen before
+        """
+        # Extracted URLs are already canonical, skip re-normalizing them
+        urls = [
+            url if url.startswith(_CANONICAL_URL_PREFIX) else self.normalize_url(url)
+            for url in video_urls
+        ]
+        matches = [(m, url) for url in urls if (m := _VIDEO_ID_IN_URL.search(url))]
+        # Username URLs go in last so they win over the /video/<id> fallback
+        batch = {int(m.group(1)): url for m, url in matches if '/@' not in url}
+        batch.update({int(m.group(1)): url for m, url in matches if '/@' in url})
+        
+        new_ids = batch.keys() - self.video_links.keys()
+        self.video_links.update({
+            video_id: url for video_id, url in batch.items()
+            if video_id in new_ids or '/@' in url
+        })
+        return len(new_ids)
+    
+    def _extract_links_from_dom(self) -> Set[str]:
+        """Collect video URLs from anchor hrefs in the live DOM with a single script call."""
+        try:
+            hrefs = self.driver.execute_script(_JS_EXTRACT)
+        except Exception as e:
+            print(f"Warning: DOM link extraction failed: {e}")
+            return set()
+        if not hrefs:
+            return set()
+        # Run the hrefs through the regex extractor to canonicalize them (drops query strings)
+        return self.extract_video_ids_from_text('\n'.join(h for h in hrefs if h))
+    
+    def _extract_from_page_source_incremental(self) -> Set[str]:
+        """
+        Extract video URLs from the page source, scanning only what changed.
+        
+        Everything before the first difference from the previously scanned
+        source was already extracted, so the regex only runs from there on
+        (with a small overlap so matches straddling the boundary are kept).
+        """
+        page_source = self.driver.page_source
+        unchanged = _common_prefix_length(self._prev_page_source, page_source)
+        self._prev_page_source = page_source
+        start = max(0, unchanged - _INCREMENTAL_SCAN_OVERLAP)
+        return self.extract_video_ids_from_text(page_source[start:])
+    
+    def _count_video_links(self) -> int:
+        """Count video link anchors currently in the DOM."""
+        try:
+            return self.driver.execute_script(_JS_COUNT_VIDEO_LINKS)
+        except Exception:
+            return 0
+    
+    def _wait_for_page_ready(self, timeout: float) -> bool:
+        """Wait until the document has loaded and at least one video link is present."""
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == 'complete'
+                and d.execute_script(_JS_COUNT_VIDEO_LINKS) > 0
+            )
+            return True
+        except TimeoutException:
+            return False
+    
+    def _wait_for_new_links(self, prior_count: int, timeout: float = 5) -> bool:
+        """Wait until more than prior_count video links are present in the DOM."""
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script(_JS_COUNT_VIDEO_LINKS) > prior_count
+            )
+            return True
+        except TimeoutException:
+            return False
+    
+    def _find_error_message(self):
+        """Return the visible "Something went wrong" message text, or None (one script call)."""
+        try:
+            return self.driver.execute_script(_JS_FIND_ERROR_MESSAGE)
+        except Exception:
+            # If the check itself fails, treat it as no error
+            return None
     
     def handle_error_page(self, max_retries: int = 3):
         """Check for error messages and click refresh if needed."""
         for attempt in range(max_retries):
             try:
                 # Check for specific error element first (most reliable method)
-                has_error = False
-                error_element = None
-                
-                try:
-                    # Check the specific error element path
-                    error_xpath = "/html/body/div[1]/div[2]/div[2]/div/main/div/p[1]"
-                    error_elements = self.driver.find_elements(By.XPATH, error_xpath)
-                    
-                    for elem in error_elements:
-                        try:
-                            if elem.is_displayed():
-                                elem_text = elem.text.strip()
-                                # Check if it contains "Something Went Wrong" (case insensitive)
-                                if elem_text and "something went wrong" in elem_text.lower():
-                                    has_error = True
-                                    error_element = elem
-                                    print(f"Found error message: '{elem_text}'")
-                                    break
-                        except:
-                            continue
-                except Exception as e:
-                    # If element not found, that's fine - no error
-                    pass
+                error_text = self._find_error_message()
+                has_error = error_text is not None
+                if has_error:
+                    print(f"Found error message: '{error_text}'")
                 
                 # If specific error element found, proceed to refresh
                 if has_error:
                     print(f"Error detected on page (attempt {attempt + 1}/{max_retries})")
                     
-                    # Try to find and click refresh button
+                    # Try to find and click refresh button - one scan of all
+                    # buttons/links in the page instead of polling each selector
                     refresh_found = False
-                    
-                    # Try multiple selectors for refresh button
-                    # Prioritize buttons that are likely to be the Refresh button
-                    refresh_selectors = [
-                        (By.XPATH, "//button[contains(., 'Refresh')]"),
-                        (By.XPATH, "//button[contains(text(), 'Refresh')]"),
-                        (By.XPATH, "//a[contains(., 'Refresh')]"),
-                        (By.XPATH, "//a[contains(text(), 'Refresh')]"),
-                        (By.XPATH, "//button[contains(., 'Try again')]"),
-                        (By.XPATH, "//button[contains(text(), 'Try again')]"),
-                        (By.XPATH, "//button[contains(., 'Reload')]"),
-                        (By.XPATH, "//button[contains(text(), 'Reload')]"),
-                        (By.CSS_SELECTOR, "button[data-e2e='refresh-button']"),
-                        (By.CSS_SELECTOR, "a[data-e2e='refresh-button']"),
-                        (By.XPATH, "//button[@type='button' and contains(., 'Refresh')]"),
-                    ]
-                    
-                    for selector_type, selector_value in refresh_selectors:
-                        try:
-                            refresh_button = WebDriverWait(self.driver, 5).until(
-                                EC.element_to_be_clickable((selector_type, selector_value))
-                            )
-                            # Make sure button is visible
-                            if refresh_button.is_displayed():
-                                print(f"Found refresh button, clicking...")
-                                refresh_button.click()
-                                refresh_found = True
-                                break
-                        except (TimeoutException, NoSuchElementException):
-                            continue
+                    try:
+                        refresh_found = bool(self.driver.execute_script(_JS_CLICK_REFRESH_BUTTON))
+                    except Exception as e:
+                        print(f"Refresh button lookup failed: {e}")
+                    if refresh_found:
+                        print("Found refresh button, clicked it")
                     
                     # If no button found, try JavaScript to reload
                     if not refresh_found:
                         print("No refresh button found, trying JavaScript reload...")
                         self.driver.execute_script("location.reload();")
                     
-                    # Wait for page to reload
+                    # Wait for page to reload (returns as soon as video links show up)
                     print("Waiting for page to reload...")
-                    time.sleep(5)
-                    
-                    # Check if error is still present after refresh
-                    time.sleep(3)  # Wait for page to fully reload
+                    self._wait_for_page_ready(timeout=8)
                     
                     # Check if we now have content
                     has_content_after = False
                     try:
-                        video_links_after = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/video/')]")
-                        video_ids_after = re.findall(r'/video/(\d+)', self.driver.page_source)
-                        has_content_after = len(video_links_after) > 0 or len(video_ids_after) > 0
-                    except:
+                        # Only serialize the page source when the DOM has no video links
+                        has_content_after = (
+                            self._count_video_links() > 0
+                            or _VIDEO_ID_IN_URL.search(self.driver.page_source) is not None
+                        )
+                    except Exception:
                         pass
                     
                     # Check if the specific error element still exists
-                    still_has_error = False
-                    try:
-                        error_xpath = "/html/body/div[1]/div[2]/div[2]/div/main/div/p[1]"
-                        error_elements_after = self.driver.find_elements(By.XPATH, error_xpath)
-                        for elem in error_elements_after:
-                            if elem.is_displayed():
-                                elem_text = elem.text.strip().lower()
-                                if "something went wrong" in elem_text:
-                                    still_has_error = True
-                                    break
-                    except:
-                        pass
+                    still_has_error = self._find_error_message() is not None
                     
                     if not still_has_error or has_content_after:
                         print("Error resolved after refresh!")
                         return True
                     else:
+                        # The next attempt reloads and waits for the page again
                         print("Error still present, will retry...")
-                        time.sleep(2)
                 else:
                     # No error found - page is fine
                     return False
                     
             except Exception as e:
                 print(f"Error while handling error page: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
         
         return False
     
-    def crawl_hashtag(self, hashtag: str, max_videos: int = None) -> List[str]:
-        """Crawl TikTok hashtag using undetected ChromeDriver."""
-        if not SELENIUM_AVAILABLE:
-            raise ImportError("Please install required packages: pip install undetected-chromedriver selenium")
+    def _first_pass_extract(self) -> Set[str]:
+        """
+        Initial extraction right after the page loads.
         
-        hashtag = hashtag.strip('#').strip()
-        url = f"https://www.tiktok.com/tag/{hashtag}"
+        Checks for the error page, then extracts from the page source and falls
+        back to the alternative extraction methods if nothing was found.
+        """
+        # Only check for errors if we haven't found any videos yet
+        # This prevents false positives on pages with normal content
+        if len(self.video_links) == 0:
+            self.handle_error_page(max_retries=1)
         
-        print(f"Starting crawl for hashtag: #{hashtag}")
-        print(f"URL: {url}")
-        print("Using undetected-chromedriver to bypass bot detection...\n")
+        # Get page source and extract video URLs
+        page_source = self.driver.page_source
+        video_urls = self.extract_video_ids_from_text(page_source)
+        
+        # Debug output
+        print(f"Initial extraction found {len(video_urls)} video URLs")
+        if len(video_urls) > 0:
+            return video_urls
+        
+        # Try alternative extraction methods
+        print("Trying alternative extraction methods...")
         
+        # Method 1: JavaScript DOM extraction
         try:
-            # Create undetected ChromeDriver instance
-            options = uc.ChromeOptions()
+            js_urls = self.driver.execute_script("""
+                const links = new Set();
+                // Find all anchor tags
+                document.querySelectorAll('a').forEach(a => {
+                    const href = a.getAttribute('href') || a.href;
+                    if (href && href.includes('/video/')) {
+                        links.add(href);
+                    }
+                });
+                // Also check data attributes
+                document.querySelectorAll('[data-e2e*="video"], [class*="video"]').forEach(el => {
+                    const href = el.getAttribute('href') || el.closest('a')?.href;
+                    if (href && href.includes('/video/')) {
+                        links.add(href);
+                    }
+                });
+                return Array.from(links);
+            """)
+            if js_urls:
+                print(f"JavaScript DOM found {len(js_urls)} video links")
+                for url in js_urls:
+                    if url and '/video/' in url:
+                        normalized = self.normalize_url(url)
+                        if normalized:
+                            video_urls.add(normalized)
+        except Exception as e:
+            print(f"JavaScript DOM extraction failed: {e}")
+        
+        # Method 2: Extract from window objects
+        if len(video_urls) == 0:
+            try:
+                # Selenium marshals the objects into dicts/lists directly - no need
+                # to JSON.stringify them and regex the string back in Python
+                window_data = self.driver.execute_script("""
+                    return {
+                        universal: window.__UNIVERSAL_DATA_FOR_REHYDRATION__ || null,
+                        sigi: window.SIGI_STATE || null
+                    };
+                """)
+                
+                if window_data:
+                    for key, state in window_data.items():
+                        if state:
+                            extracted = _walk_for_videos(state)
+                            if extracted:
+                                print(f"Extracted {len(extracted)} URLs from {key} data")
+                                video_urls.update(extracted)
+            except Exception as e:
+                print(f"Window data extraction failed: {e}")
+        
+        # Method 3: Force wait and retry (headless might need more time)
+        if len(video_urls) == 0 and self.headless:
+            print("Headless mode: Waiting longer for content to load...")
+            self._wait_for_page_ready(timeout=5)
+            # Retry extraction
+            page_source_retry = self.driver.page_source
+            video_urls_retry = self.extract_video_ids_from_text(page_source_retry)
+            if video_urls_retry:
+                print(f"Retry extraction found {len(video_urls_retry)} URLs")
+                video_urls.update(video_urls_retry)
             
-            # Better headless mode settings - TikTok may detect headless, so use minimal headless
-            # IMPORTANT: TikTok often blocks headless browsers. Consider using non-headless mode.
-            if self.headless:
-                print("⚠️  Running in headless mode - TikTok may not load video content.")
-                print("   If no videos are found, try running without --headless flag.\n")
-
-                options.add_argument('--headless')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--window-size=1920,1080')
-                # Important: Don't use --disable-features that might trigger detection
-                options.add_argument('--disable-features=IsolateOrigins,site-per-process')
+            # If still no videos and auto_fallback is enabled, suggest fallback
+            if len(video_urls) == 0 and self.auto_fallback:
+                print("\n⚠️  WARNING: Headless mode detected - TikTok may not load content in headless mode.")
+                print("   TikTok's anti-bot protection often blocks headless browsers.")
+                print("   Consider running without --headless flag for better results.")
+                print("   Continuing with headless mode...\n")
+        
+        return video_urls
+    
+    def _is_driver_alive(self) -> bool:
+        """Check if the current driver is still alive and responsive."""
+        if self.driver is None:
+            return False
+        try:
+            # Try to get current URL - this will fail if driver is dead
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _ensure_driver(self):
+        """
+        Lazily create (or borrow from the pool) the Chrome driver, reusing it across
+        crawls while it is alive.
+        
+        Returns:
+            The undetected ChromeDriver instance
+        """
+        if self._is_driver_alive():
+            return self.driver
+        # Drop a dead driver before launching a replacement
+        self.close(discard=True)
+        
+        if self.pool is not None:
+            self.driver = self.pool.acquire()
+            # Pooled drivers may come from another factory without the stealth script
+            self._install_stealth_script(self.driver)
+        else:
+            self.driver = self._create_driver()
+        return self.driver
+    
+    @staticmethod
+    def _install_stealth_script(driver):
+        """Run the stealth script on every new document loaded by driver (registered once per driver)."""
+        if getattr(driver, '_stealth_installed', False):
+            return  # A reused driver already has it; registering again would stack copies
+        # Execute JavaScript to simulate focus, visibility, and user presence
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _STEALTH_JS})
+            driver._stealth_installed = True
+        except Exception as e:
+            print(f"Warning: Could not set up stealth scripts: {e}")
+    
+    def _create_driver(self):
+        """
+        Launch a new undetected ChromeDriver with the crawler's stealth settings.
+        
+        Doesn't touch self.driver, so it also works as a BrowserPool factory.
+        """
+        # Create undetected ChromeDriver instance
+        options = _uc().ChromeOptions()
+        
+        # Better headless mode settings - TikTok may detect headless, so use minimal headless
+        # IMPORTANT: TikTok often blocks headless browsers. Consider using non-headless mode.
+        if self.headless:
+            print("⚠️  Running in headless mode - TikTok may not load video content.")
+            print("   If no videos are found, try running without --headless flag.\n")
+
+            # New headless mode renders like regular Chrome
+            options.add_argument('--headless=new')
+            options.add_argument('--window-size=1920,1080')
+            # Important: Don't use --disable-features that might trigger detection
+            options.add_argument('--disable-features=IsolateOrigins,site-per-process')
+        else:
+            options.add_argument('--start-maximized')
+        
+        # Anti-detection arguments
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-web-security')
+        options.add_argument('--disable-features=VizDisplayCompositor')
+        options.add_argument('--disable-infobars')
+        options.add_argument('--disable-extensions')
+        
+        # User agent
+        options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        
+        # Performance: only the DOM's video anchors are needed, so skip images/media,
+        # GPU compositing and browser logging, and don't wait for every subresource
+        options.add_argument('--disable-gpu')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.media_stream': 2,
+        })
+        options.set_capability('goog:loggingPrefs', {'performance': 'OFF'})
+        options.page_load_strategy = 'eager'
+        
+        print("Launching Chrome browser...")
+        # Use undetected_chromedriver with better stealth
+        driver = _uc().Chrome(
+            options=options, 
+            version_main=None,
+            use_subprocess=True  # Better for headless
+        )
+        driver.set_page_load_timeout(60)
+        
+        # Set window size explicitly
+        if self.headless:
+            try:
+                driver.set_window_size(1920, 1080)
+            except Exception:
+                pass
+        
+        self._install_stealth_script(driver)
+        
+        return driver
+    
+    def close(self, discard: bool = False):
+        """
+        Quit the browser, or hand it back to the pool if it was borrowed.
+        
+        Args:
+            discard: Quit a pooled driver instead of returning it (e.g. after an error)
+        """
+        if self.driver:
+            if self.pool is not None:
+                print("\nReturning browser to pool...")
+                self.pool.release(self.driver, discard=discard)
             else:
-                options.add_argument('--start-maximized')
-            
-            # Anti-detection arguments
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--disable-features=VizDisplayCompositor')
-            options.add_argument('--disable-infobars')
-            options.add_argument('--disable-extensions')
-            
-            # User agent
-            options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            print("Launching Chrome browser...")
-            # Use undetected_chromedriver with better stealth
-            self.driver = uc.Chrome(
-                options=options, 
-                version_main=None,
-                use_subprocess=True  # Better for headless
-            )
-            self.driver.set_page_load_timeout(60)
-            
-            # Set window size explicitly
-            if self.headless:
+                print("\nClosing browser...")
                 try:
-                    self.driver.set_window_size(1920, 1080)
-                except:
+                    self.driver.quit()
+                except Exception:
                     pass
-            
-            # Execute JavaScript to simulate focus, visibility, and user presence
+            self.driver = None
+    
+    def _crawl_url(self, url: str, max_videos: int = None):
+        """Load a hashtag page in the current driver and scroll it, collecting into self.video_links."""
+        print(f"Loading page: {url}")
+        
+        # Simulate focus and user presence before loading
+        if self.headless:
+            try:
+                # Use CDP to simulate focus
+                self.driver.execute_cdp_cmd('Runtime.evaluate', {'expression': _FOCUS_JS})
+            except Exception:
+                pass
+        
+        self.driver.get(url)
+        
+        # Wait for page to load - longer wait for headless
+        wait_time = 12 if self.headless else 8
+        print(f"Waiting for page to load (up to {wait_time}s)...")
+        if not self._wait_for_page_ready(timeout=wait_time):
+            print("Warning: No video links appeared before the load timeout")
+        
+        # In headless mode, try to trigger content loading by simulating interactions
+        if self.headless:
             try:
-                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                    'source': '''
-                        // Override visibility and focus detection
-                        Object.defineProperty(document, 'hidden', { 
-                            get: () => false,
-                            configurable: true
-                        });
-                        Object.defineProperty(document, 'visibilityState', { 
-                            get: () => 'visible',
-                            configurable: true
-                        });
-                        Object.defineProperty(document, 'hasFocus', {
-                            value: () => true,
-                            configurable: true
-                        });
-                        
-                        // Remove webdriver flag
-                        Object.defineProperty(navigator, 'webdriver', { 
-                            get: () => undefined,
-                            configurable: true
-                        });
-                        
-                        // Add chrome object
-                        window.chrome = { 
-                            runtime: {},
-                            loadTimes: function() {},
-                            csi: function() {},
-                            app: {}
-                        };
-                        
-                        // Add plugins
-                        Object.defineProperty(navigator, 'plugins', { 
-                            get: () => [1, 2, 3, 4, 5],
-                            configurable: true
-                        });
-                        
-                        // Add languages
-                        Object.defineProperty(navigator, 'languages', { 
-                            get: () => ['en-US', 'en'],
-                            configurable: true
-                        });
-                        
-                        // Simulate focus events
-                        window.addEventListener('focus', () => {}, true);
-                        window.addEventListener('blur', () => {}, true);
-                        
-                        // Dispatch focus event
-                        window.dispatchEvent(new Event('focus'));
-                        document.dispatchEvent(new Event('visibilitychange'));
-                    '''
+                # Try scrolling a bit to trigger lazy loading; returns as soon as it does
+                prior_count = self._count_video_links()
+                self.driver.execute_script("window.scrollTo(0, 100);")
+                self._wait_for_new_links(prior_count, timeout=4)
+                self.driver.execute_script("window.scrollTo(0, 0);")
+            except Exception:
+                pass
+        
+        # Simulate user interaction in headless mode
+        if self.headless:
+            # Simulate mouse movement, focus, and user activity
+            try:
+                # Multiple interaction simulations
+                self.driver.execute_script(_INTERACTION_JS)
+                
+                # Also use CDP to simulate input
+                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
+                    'type': 'mouseMoved',
+                    'x': 100,
+                    'y': 100
                 })
             except Exception as e:
-                print(f"Warning: Could not set up stealth scripts: {e}")
-            
-            print(f"Loading page: {url}")
-            
-            # Simulate focus and user presence before loading
-            if self.headless:
-                try:
-                    # Use CDP to simulate focus
-                    self.driver.execute_cdp_cmd('Runtime.evaluate', {
-                        'expression': 'window.focus(); document.hasFocus = () => true;'
-                    })
-                except:
-                    pass
-            
-            self.driver.get(url)
+                print(f"Warning: Could not simulate interactions: {e}")
+        
+        # Check for "Something went wrong" error and handle it
+        self.handle_error_page()
+        
+        # Try to wait for specific elements
+        try:
+            WebDriverWait(self.driver, 10).until(
+                lambda d: d.execute_script("return document.getElementsByTagName('a').length;") > 10
+            )
+            print("Page content loaded successfully")
+        except TimeoutException:
+            print("Warning: Page may not have loaded completely")
+            # Continue anyway
+        
+        # Extract video links from page source
+        print("Extracting video links from page...")
+        
+        # Debug: Check page content
+        try:
+            page_source = self.driver.page_source
+            page_length = len(page_source)
+            print(f"Page source length: {page_length} characters")
             
-            # Wait for page to load - longer wait for headless
-            wait_time = 12 if self.headless else 8
-            print(f"Waiting for page to load ({wait_time}s)...")
-            time.sleep(wait_time)
+            # Check if page has TikTok content
+            has_tiktok_content = 'tiktok' in page_source.lower() or 'video' in page_source.lower()
+            print(f"Page contains TikTok/video content: {has_tiktok_content}")
             
-            # In headless mode, try to trigger content loading by simulating interactions
-            if self.headless:
-                try:
-                    # Try scrolling a bit to trigger lazy loading
-                    self.driver.execute_script("window.scrollTo(0, 100);")
-                    time.sleep(2)
-                    self.driver.execute_script("window.scrollTo(0, 0);")
-                    time.sleep(2)
-                except:
-                    pass
+            # Try to find any video-related elements
+            try:
+                print(f"Found {self._count_video_links()} video link elements in DOM")
+            except Exception:
+                pass
+        except Exception as e:
+            print(f"Warning: Could not analyze page: {e}")
+        
+        scroll_count = 0
+        max_scrolls = 100 if max_videos is None else min(max_videos // 5 + 10, 50)
+        no_change_count = 0
+        recent_yields = deque(maxlen=_YIELD_WINDOW)  # New videos found per recent scroll
+        
+        # Error check and alternative extraction methods only need to run once
+        video_urls = self._first_pass_extract()
+        
+        while scroll_count < max_scrolls:
+            # Add new video URLs
+            new_count = self._add_video_links(video_urls)
             
-            # Simulate user interaction in headless mode
-            if self.headless:
-                # Simulate mouse movement, focus, and user activity
-                try:
-                    # Multiple interaction simulations
-                    self.driver.execute_script("""
-                        // Simulate focus
-                        window.dispatchEvent(new Event('focus', { bubbles: true }));
-                        document.dispatchEvent(new Event('visibilitychange', { bubbles: true }));
-                        
-                        // Simulate mouse movement
-                        document.dispatchEvent(new MouseEvent('mousemove', {
-                            bubbles: true,
-                            cancelable: true,
-                            view: window,
-                            clientX: 100,
-                            clientY: 100
-                        }));
-                        
-                        // Simulate scroll
-                        window.dispatchEvent(new Event('scroll', { bubbles: true }));
-                        
-                        // Ensure document appears focused
-                        if (document.hasFocus) {
-                            Object.defineProperty(document, 'hasFocus', {
-                                value: () => true,
-                                writable: false
-                            });
-                        }
-                    """)
-                    
-                    # Also use CDP to simulate input
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseMoved',
-                        'x': 100,
-                        'y': 100
-                    })
-                except Exception as e:
-                    print(f"Warning: Could not simulate interactions: {e}")
+            current_count = len(self.video_links)
+            recent_yields.append(new_count)
             
-            # Check for "Something went wrong" error and handle it
-            self.handle_error_page()
+            if new_count > 0:
+                print(f"Found {new_count} new videos (total: {current_count})")
+                no_change_count = 0
+            else:
+                no_change_count += 1
+                if no_change_count >= 5:  # Increased threshold
+                    print("No new videos found after multiple scrolls. Stopping.")
+                    break
             
-            # Try to wait for specific elements
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    lambda d: len(d.find_elements(By.TAG_NAME, "a")) > 10
-                )
-                print("Page content loaded successfully")
-            except TimeoutException:
-                print("Warning: Page may not have loaded completely")
-                # Continue anyway
+            # Stop on a long tail of scrolls that barely yield anything
+            if (len(recent_yields) == _YIELD_WINDOW
+                    and sum(recent_yields) / _YIELD_WINDOW < _MIN_YIELD_PER_SCROLL):
+                print(f"Fewer than {_MIN_YIELD_PER_SCROLL} new videos per scroll over the last "
+                      f"{_YIELD_WINDOW} scrolls. Stopping.")
+                break
             
-            # Extract video links from page source
-            print("Extracting video links from page...")
+            if max_videos and current_count >= max_videos:
+                print(f"Reached max videos limit ({max_videos})")
+                break
             
-            # Debug: Check page content
-            try:
-                page_source = self.driver.page_source
-                page_length = len(page_source)
-                print(f"Page source length: {page_length} characters")
-                
-                # Check if page has TikTok content
-                has_tiktok_content = 'tiktok' in page_source.lower() or 'video' in page_source.lower()
-                print(f"Page contains TikTok/video content: {has_tiktok_content}")
-                
-                # Try to find any video-related elements
-                try:
-                    video_elements = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/video/')]")
-                    print(f"Found {len(video_elements)} video link elements in DOM")
-                except:
-                    pass
-            except Exception as e:
-                print(f"Warning: Could not analyze page: {e}")
+            # Scroll down to load more
+            print(f"Scrolling down ({scroll_count + 1}/{max_scrolls})...")
+            prior_link_count = self._count_video_links()
+            # Back off the wait exponentially while scrolls keep coming up empty
+            scroll_wait = min(4, 0.5 * 2 ** no_change_count)
             
-            scroll_count = 0
-            max_scrolls = 100 if max_videos is None else min(max_videos // 5 + 10, 50)
-            no_change_count = 0
+            # Scroll to bottom (lazy loading fires on the final position, so a
+            # separate smooth scroll first adds nothing)
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            self._wait_for_new_links(prior_link_count, timeout=scroll_wait)  # Wait for new content to load
             
-            while scroll_count < max_scrolls:
-                # Only check for errors if we haven't found any videos yet
-                # This prevents false positives on pages with normal content
-                if len(self.video_links) == 0 and scroll_count == 0:
-                    self.handle_error_page(max_retries=1)
-                
-                # Get page source and extract video URLs
-                page_source = self.driver.page_source
-                video_urls = self.extract_video_ids_from_text(page_source)
-                
-                # Debug output
-                if scroll_count == 0:
-                    print(f"Initial extraction found {len(video_urls)} video URLs")
-                    if len(video_urls) == 0:
-                        # Try alternative extraction methods
-                        print("Trying alternative extraction methods...")
-                        
-                        # Method 1: JavaScript DOM extraction
-                        try:
-                            js_urls = self.driver.execute_script("""
-                                const links = new Set();
-                                // Find all anchor tags
-                                document.querySelectorAll('a').forEach(a => {
-                                    const href = a.getAttribute('href') || a.href;
-                                    if (href && href.includes('/video/')) {
-                                        links.add(href);
-                                    }
-                                });
-                                // Also check data attributes
-                                document.querySelectorAll('[data-e2e*="video"], [class*="video"]').forEach(el => {
-                                    const href = el.getAttribute('href') || el.closest('a')?.href;
-                                    if (href && href.includes('/video/')) {
-                                        links.add(href);
-                                    }
-                                });
-                                return Array.from(links);
-                            """)
-                            if js_urls:
-                                print(f"JavaScript DOM found {len(js_urls)} video links")
-                                for url in js_urls:
-                                    if url and '/video/' in url:
-                                        normalized = self.normalize_url(url)
-                                        if normalized:
-                                            video_urls.add(normalized)
-                        except Exception as e:
-                            print(f"JavaScript DOM extraction failed: {e}")
-                        
-                        # Method 2: Extract from window objects
-                        if len(video_urls) == 0:
-                            try:
-                                window_data = self.driver.execute_script("""
-                                    let data = {};
-                                    // Try to get data from window objects
-                                    if (window.__UNIVERSAL_DATA_FOR_REHYDRATION__) {
-                                        data.universal = JSON.stringify(window.__UNIVERSAL_DATA_FOR_REHYDRATION__);
-                                    }
-                                    if (window.SIGI_STATE) {
-                                        data.sigi = JSON.stringify(window.SIGI_STATE);
-                                    }
-                                    return data;
-                                """)
-                                
-                                if window_data:
-                                    for key, json_str in window_data.items():
-                                        if json_str:
-                                            extracted = self.extract_video_ids_from_text(json_str)
-                                            if extracted:
-                                                print(f"Extracted {len(extracted)} URLs from {key} data")
-                                                video_urls.update(extracted)
-                            except Exception as e:
-                                print(f"Window data extraction failed: {e}")
-                        
-                        # Method 3: Force wait and retry (headless might need more time)
-                        if len(video_urls) == 0 and self.headless:
-                            print("Headless mode: Waiting longer for content to load...")
-                            time.sleep(5)
-                            # Retry extraction
-                            page_source_retry = self.driver.page_source
-                            video_urls_retry = self.extract_video_ids_from_text(page_source_retry)
-                            if video_urls_retry:
-                                print(f"Retry extraction found {len(video_urls_retry)} URLs")
-                                video_urls.update(video_urls_retry)
-                            
-                            # If still no videos and auto_fallback is enabled, suggest fallback
-                            if len(video_urls) == 0 and self.auto_fallback and scroll_count == 0:
-                                print("\n⚠️  WARNING: Headless mode detected - TikTok may not load content in headless mode.")
-                                print("   TikTok's anti-bot protection often blocks headless browsers.")
-                                print("   Consider running without --headless flag for better results.")
-                                print("   Continuing with headless mode...\n")
-                
-                # Add new video URLs
-                new_count = 0
-                for video_url in video_urls:
-                    normalized_url = self.normalize_url(video_url)
-                    if normalized_url not in self.video_links:
-                        self.video_links.add(normalized_url)
-                        new_count += 1
-                
-                current_count = len(self.video_links)
-                
-                if new_count > 0:
-                    print(f"Found {new_count} new videos (total: {current_count})")
-                    no_change_count = 0
-                else:
-                    no_change_count += 1
-                    if no_change_count >= 5:  # Increased threshold
-                        print("No new videos found after multiple scrolls. Stopping.")
-                        break
-                
-                if max_videos and current_count >= max_videos:
-                    print(f"Reached max videos limit ({max_videos})")
-                    break
-                
-                # Scroll down to load more - try different scroll strategies
-                print(f"Scrolling down ({scroll_count + 1}/{max_scrolls})...")
-                
-                # Smooth scroll
-                self.driver.execute_script("""
-                    window.scrollBy({
-                        top: window.innerHeight,
-                        behavior: 'smooth'
-                    });
-                """)
-                time.sleep(2)  # Wait for smooth scroll
-                
-                # Scroll to bottom
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)  # Wait for new content to load
-                
-                scroll_count += 1
+            scroll_count += 1
             
-            # Final extraction
-            print("\nPerforming final extraction...")
-            page_source = self.driver.page_source
-            final_video_urls = self.extract_video_ids_from_text(page_source)
-            for video_url in final_video_urls:
-                normalized_url = self.normalize_url(video_url)
-                self.video_links.add(normalized_url)
+            # Pull video hrefs straight from the live DOM; only fall back to
+            # serializing the whole page source when that finds nothing
+            video_urls = self._extract_links_from_dom()
+            if not video_urls:
+                video_urls = self._extract_from_page_source_incremental()
+        
+        # Final extraction - video_urls holds the extraction from the last page state
+        print("\nPerforming final extraction...")
+        self._add_video_links(video_urls)
+    
+    def crawl_hashtag(self, hashtag: str, max_videos: int = None,
+                      keep_driver_open: bool = False) -> List[str]:
+        """
+        Crawl TikTok hashtag using undetected ChromeDriver.
+        
+        Args:
+            hashtag: Hashtag to crawl (with or without '#')
+            max_videos: Max videos to collect
+            keep_driver_open: Leave the browser running so the next crawl skips the
+                Chrome cold start; call close() when done
+        """
+        if not SELENIUM_AVAILABLE:
+            raise ImportError("Please install required packages: pip install undetected-chromedriver selenium")
+        
+        hashtag = hashtag.strip('#').strip()
+        url = f"https://www.tiktok.com/tag/{hashtag}"
+        self.video_links.clear()
+        self._prev_page_source = ''
+        
+        print(f"Starting crawl for hashtag: #{hashtag}")
+        print(f"URL: {url}")
+        print("Using undetected-chromedriver to bypass bot detection...\n")
+        
+        crawl_failed = False
+        try:
+            self._ensure_driver()
+            self._crawl_url(url, max_videos)
             
         except Exception as e:
+            crawl_failed = True
             print(f"Error during crawling: {e}")
-            import traceback
-            traceback.print_exc()
+            log.debug("Crawl of %s failed", url, exc_info=True)
         
         finally:
-            if self.driver:
-                print("\nClosing browser...")
-                self.driver.quit()
+            if not keep_driver_open:
+                self.close(discard=crawl_failed)
         
-        result = sorted(list(self.video_links))
-        if max_videos:
-            result = result[:max_videos]
+        # Integer sort on the video IDs instead of comparing full URL strings; when
+        # only the first max_videos are kept, a partial sort is enough
+        if max_videos and max_videos < len(self.video_links):
+            video_ids = heapq.nsmallest(max_videos, self.video_links)
+        else:
+            video_ids = sorted(self.video_links)
+        result = [self.video_links[video_id] for video_id in video_ids]
         
         print(f"\nCrawl complete! Found {len(result)} unique videos.")
         return result
+    
+    def crawl_hashtags(self, tags: List[str], max_videos: int = None,
+                       workers: int = 1) -> Dict[str, List[str]]:
+        """
+        Crawl several hashtags, reusing browsers instead of launching one per tag.
+        
+        Args:
+            tags: Hashtags to crawl
+            max_videos: Max videos to collect per hashtag
+            workers: Number of parallel processes; each one owns a single browser
+                (chromedriver isn't thread-safe, so shards run in processes)
+        
+        Returns:
+            Dict mapping each hashtag to its list of video links
+        """
+        results = {}
+        if workers <= 1:
+            try:
+                for tag in tags:
+                    results[tag] = self.crawl_hashtag(tag, max_videos, keep_driver_open=True)
+            finally:
+                self.close()
+            return results
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_crawl_worker,
+                                 initargs=(self.headless, self.auto_fallback)) as executor:
+            futures = {executor.submit(_crawl_in_worker, tag, max_videos): tag for tag in tags}
+            for future in as_completed(futures):
+                tag = futures[future]
+                try:
+                    results[tag] = future.result()
+                except Exception as e:
+                    print(f"Error crawling #{tag}: {e}")
+                    results[tag] = []
+        return results
+
+
+# Per-process crawler used by HashtagCrawler.crawl_hashtags worker processes
+_worker_crawler = None
+
+
+def _init_crawl_worker(headless: bool, auto_fallback: bool):
+    """Create this worker process's crawler; its browser is closed on process exit."""
+    global _worker_crawler
+    _worker_crawler = HashtagCrawler(headless=headless, auto_fallback=auto_fallback)
+    # Pool workers leave through os._exit, which skips atexit; multiprocessing
+    # runs its own finalizers first
+    Finalize(None, _worker_crawler.close, exitpriority=10)
+
+
+def _crawl_in_worker(tag: str, max_videos: int = None) -> List[str]:
+    """Crawl one hashtag with the worker process's long-lived browser."""
+    return _worker_crawler.crawl_hashtag(tag, max_videos, keep_driver_open=True)
 
 
 def crawl_with_requests(hashtag: str) -> List[str]:
@@ -635,30 +1286,35 @@ def crawl_with_requests(hashtag: str) -> List[str]:
     print(f"\nTrying direct API approach for hashtag: #{hashtag}")
     
     # Try to get challenge detail first
+    # Only the Referer varies per hashtag; the rest lives on the shared session
     headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-US,en;q=0.9',
         'Referer': f'https://www.tiktok.com/tag/{hashtag}',
     }
     
     try:
-        # Get challenge detail to get challenge ID
-        challenge_url = f"https://www.tiktok.com/api/challenge/detail/"
-        params = {
-            'challengeName': hashtag,
-            'aid': '1988',
-        }
-        
-        response = requests.get(challenge_url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            challenge_id = data.get('challengeInfo', {}).get('challenge', {}).get('id')
+        challenge_id = _load_challenge_ids().get(hashtag.lower())
+        if challenge_id:
+            print(f"Using cached challenge ID: {challenge_id}")
+        else:
+            # Get challenge detail to get challenge ID
+            challenge_url = f"https://www.tiktok.com/api/challenge/detail/"
+            params = {
+                'challengeName': hashtag,
+                'aid': '1988',
+            }
             
-            if challenge_id:
-                print(f"Found challenge ID: {challenge_id}")
-                print("Note: Getting video list requires authentication tokens.")
-                print("This approach needs additional setup (cookies, tokens, etc.)")
+            body = _conditional_get(challenge_url, f"challenge_detail:{hashtag}",
+                                    headers=headers, params=params, timeout=10)
+            if body:
+                data = json.loads(body)
+                challenge_id = data.get('challengeInfo', {}).get('challenge', {}).get('id')
+                if challenge_id:
+                    print(f"Found challenge ID: {challenge_id}")
+                    _save_challenge_id(hashtag.lower(), challenge_id)
+        
+        if challenge_id:
+            print("Note: Getting video list requires authentication tokens.")
+            print("This approach needs additional setup (cookies, tokens, etc.)")
         
     except Exception as e:
         print(f"API request failed: {e}")
@@ -670,20 +1326,35 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='TikTok Hashtag Crawler')
-    parser.add_argument('hashtag', nargs='?', default='nhuabinhminh', help='Hashtag to crawl')
-    parser.add_argument('--max-videos', type=int, default=None, help='Max videos to collect')
-    parser.add_argument('--output', '-o', default=None, help='Output JSON file')
+    parser.add_argument('hashtags', nargs='*', default=['nhuabinhminh'], metavar='hashtag',
+                       help='Hashtag(s) to crawl')
+    parser.add_argument('--max-videos', type=int, default=None, help='Max videos to collect per hashtag')
+    parser.add_argument('--output', '-o', default=None,
+                       help='Output JSON file (single hashtag only; default: tiktok_<hashtag>_videos.json)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Parallel browser processes when crawling several hashtags (default: 1)')
     parser.add_argument('--headless', action='store_true', 
                        help='Run in headless mode (Note: TikTok may not load content in headless mode)')
     parser.add_argument('--no-fallback', action='store_true',
                        help='Disable automatic fallback warnings')
     parser.add_argument('--method', choices=['selenium', 'api'], default='selenium',
                        help='Crawling method to use')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Log full tracebacks for errors')
     
     args = parser.parse_args()
     
+    # Tracebacks are logged at DEBUG, so they only cost anything with --verbose
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s t=%(threadName)s %(message)s')
+    if args.verbose:
+        log.setLevel(logging.DEBUG)  # Not the root logger: selenium / urllib3 are very chatty at DEBUG
+    
+    if args.output and len(args.hashtags) > 1:
+        print("Error: --output can only be used with a single hashtag")
+        return
+    
     if args.method == 'api':
-        video_links = crawl_with_requests(args.hashtag)
+        results = {tag: crawl_with_requests(tag) for tag in args.hashtags}
     else:
         if not SELENIUM_AVAILABLE:
             print("ERROR: undetected-chromedriver not installed!")
@@ -691,29 +1362,32 @@ def main():
             return
         
         crawler = HashtagCrawler(headless=args.headless, auto_fallback=not args.no_fallback)
-        video_links = crawler.crawl_hashtag(args.hashtag, args.max_videos)
-    
-    # Save results
-    output_file = args.output or f"tiktok_{args.hashtag}_videos.json"
-    
-    result = {
-        'hashtag': args.hashtag,
-        'total_videos': len(video_links),
-        'video_links': video_links,
-        'crawl_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'method': args.method
-    }
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+        if len(args.hashtags) == 1:
+            results = {args.hashtags[0]: crawler.crawl_hashtag(args.hashtags[0], args.max_videos)}
+        else:
+            results = crawler.crawl_hashtags(args.hashtags, args.max_videos, workers=args.workers)
     
-    print(f"\nResults saved to: {output_file}")
-    if video_links:
-        print(f"\nFirst 5 video links:")
-        for i, link in enumerate(video_links[:5], 1):
-            print(f"  {i}. {link}")
-    else:
-        print("\nNo video links found.")
+    # Save results, one file per hashtag
+    for hashtag, video_links in results.items():
+        output_file = args.output or f"tiktok_{hashtag}_videos.json"
+        
+        result = {
+            'hashtag': hashtag,
+            'total_videos': len(video_links),
+            'video_links': video_links,
+            'crawl_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'method': args.method
+        }
+        
+        output_file = _dump_json(result, output_file, ignore_keys=('crawl_timestamp',))
+        
+        print(f"\nResults saved to: {output_file}")
+        if video_links:
+            print(f"\nFirst 5 video links:")
+            for i, link in enumerate(video_links[:5], 1):
+                print(f"  {i}. {link}")
+        else:
+            print("\nNo video links found.")
 
 
 if __name__ == '__main__':
@@ -6,14 +6,41 @@ Main script to run TikTok hashtag crawler and video metadata extractor in sequen
 import sys
 import os
 import argparse
+import logging
+import time
 from pathlib import Path
 import re
 
 # Import from hashtag_crawler
-from hashtag_crawler import HashtagCrawler, crawl_with_requests, SELENIUM_AVAILABLE as CRAWLER_SELENIUM_AVAILABLE
+from hashtag_crawler import HashtagCrawler, crawl_with_requests, _dump_json, SELENIUM_AVAILABLE as CRAWLER_SELENIUM_AVAILABLE
 
 # Import from video_metadata_extractor
-from video_metadata_extractor import TikTokVideoMetadataExtractor, load_links_from_json, SELENIUM_AVAILABLE as EXTRACTOR_SELENIUM_AVAILABLE
+from video_metadata_extractor import TikTokVideoMetadataExtractor, RateGate, create_browser_pool, load_links_from_json, SELENIUM_AVAILABLE as EXTRACTOR_SELENIUM_AVAILABLE
+
+from browser_pool import BrowserPool
+
+log = logging.getLogger(__name__)
+
+# Characters replaced with '_' when the hashtag is used in a file name
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9_]+')
+
+
+def _excel_rows(filtered):
+    """Yield one plain value tuple per (video, joined_tags) pair for a write-only sheet."""
+    for video, joined_tags in filtered:
+        yield (
+            video.get('url'),
+            video.get('username'),
+            video.get('title'),
+            video.get('description'),
+            video.get('like_count'),
+            video.get('comment_count'),
+            video.get('share_count'),
+            video.get('view_count'),
+            video.get('archive_count'),
+            joined_tags,
+            video.get('error'),
+        )
 
 
 def export_filtered_videos_to_excel(videos, hashtag, base_output_path=None, excel_path=None):
@@ -26,18 +53,19 @@ def export_filtered_videos_to_excel(videos, hashtag, base_output_path=None, exce
         print("Filter hashtag is empty after stripping '#'. Skipping export.")
         return
     
-    filtered = []
-    for video in videos or []:
-        if not isinstance(video, dict):
-            continue
-        tags = video.get('hashtags') or []
-        normalized_tags = [
-            str(tag).lstrip('#').lower()
-            for tag in tags
-            if isinstance(tag, str)
-        ]
-        if normalized_target in normalized_tags:
-            filtered.append(video)
+    def has_target_tag(video):
+        # Stops at the first matching tag instead of normalizing the whole list
+        return any(
+            isinstance(tag, str) and tag.lstrip('#').lower() == normalized_target
+            for tag in (video.get('hashtags') or [])
+        )
+    
+    # (video, joined hashtag column) pairs; the column is built once per matching video
+    filtered = [
+        (video, ', '.join(tag for tag in video.get('hashtags') or [] if isinstance(tag, str)))
+        for video in videos or []
+        if isinstance(video, dict) and has_target_tag(video)
+    ]
     
     if not filtered:
         print(f"No videos found containing hashtag '#{normalized_target}'. Skipping Excel export.")
@@ -49,16 +77,16 @@ def export_filtered_videos_to_excel(videos, hashtag, base_output_path=None, exce
         print("openpyxl is required to export Excel files. Install with: pip install openpyxl")
         return
     
-    safe_tag = re.sub(r'[^A-Za-z0-9_]+', '_', normalized_target)
+    safe_tag = _UNSAFE_FILENAME_CHARS.sub('_', normalized_target)
     if excel_path:
         excel_file = Path(excel_path)
     else:
         base_path = Path(base_output_path) if base_output_path else Path.cwd() / "filtered_metadata.json"
         excel_file = base_path.with_name(f"{base_path.stem}_{safe_tag}_filtered.xlsx")
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Filtered Videos"
+    # Write-only mode streams rows to the file instead of keeping every cell in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Filtered Videos")
     
     headers = [
         "url", "username", "title", "description", "like_count",
@@ -67,20 +95,7 @@ def export_filtered_videos_to_excel(videos, hashtag, base_output_path=None, exce
     ]
     ws.append(headers)
     
-    for video in filtered:
-        row = [
-            video.get('url'),
-            video.get('username'),
-            video.get('title'),
-            video.get('description'),
-            video.get('like_count'),
-            video.get('comment_count'),
-            video.get('share_count'),
-            video.get('view_count'),
-            video.get('archive_count'),
-            ', '.join(video.get('hashtags', [])),
-            video.get('error'),
-        ]
+    for row in _excel_rows(filtered):
         ws.append(row)
     
     excel_file.parent.mkdir(parents=True, exist_ok=True)
@@ -135,15 +150,28 @@ Examples:
                        help='Number of parallel threads for metadata extraction (default: 5)')
     parser.add_argument('--no-threading', action='store_true',
                        help='Disable multi-threading in metadata extractor')
+    parser.add_argument('--pin-cpus', action='store_true',
+                       help='Give each extractor browser its own share of the CPU cores (Linux only)')
+    parser.add_argument('--resume', action='store_true',
+                       help="Skip videos the previous run's metadata progress file already has results for")
     parser.add_argument('--limit', type=int, default=None,
                        help='Limit number of videos to process in metadata extraction')
     parser.add_argument('--finalize', action='store_true',
-                       help='After extraction, retry failed extractions in single-threaded mode')
+                       help='After extraction, retry failed extractions')
     parser.add_argument('--filter-excel', type=str, default=None,
                        help='Optional Excel file path for filtered results')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Log full tracebacks for errors')
     
     args = parser.parse_args()
     
+    # Tracebacks are logged at DEBUG, so they only cost anything with --verbose
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s t=%(threadName)s %(message)s')
+    if args.verbose:
+        # Only this project's loggers: selenium / urllib3 are very chatty at DEBUG
+        for name in (__name__, 'hashtag_crawler', 'video_metadata_extractor'):
+            logging.getLogger(name).setLevel(logging.DEBUG)
+    
     # Check if Selenium is available
     if not CRAWLER_SELENIUM_AVAILABLE and not args.skip_crawl:
         print("ERROR: undetected-chromedriver not installed!")
@@ -155,6 +183,18 @@ Examples:
         print("Install with: pip install undetected-chromedriver selenium")
         return 1
     
+    # One pool of warm browsers shared by every extractor thread, so Chrome starts
+    # once per slot instead of once per chunk. The crawler launches its own: it
+    # needs its stealth options and the feed XHRs the extractor's browsers block
+    pool = create_browser_pool(headless=args.headless, num_threads=args.threads, pin_cpus=args.pin_cpus)
+    try:
+        return _run_pipeline(args, parser, pool)
+    finally:
+        pool.close()
+
+
+def _run_pipeline(args, parser, pool: BrowserPool):
+    """Run the crawl and metadata extraction steps, borrowing browsers from pool."""
     crawler_output_file = None
     input_file = args.input
     
@@ -174,6 +214,7 @@ Examples:
             if args.method == 'api':
                 video_links = crawl_with_requests(args.hashtag)
             else:
+                # The crawler always runs windowed, on its own browser
                 crawler = HashtagCrawler(
                     headless=False,
                     auto_fallback=not args.no_fallback
@@ -181,8 +222,6 @@ Examples:
                 video_links = crawler.crawl_hashtag(args.hashtag, args.max_videos)
             
             # Save crawler results
-            import json
-            import time
             result = {
                 'hashtag': args.hashtag,
                 'total_videos': len(video_links),
@@ -191,8 +230,8 @@ Examples:
                 'method': args.method
             }
             
-            with open(crawler_output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            # Large results come back as a .json.gz path
+            crawler_output_file = _dump_json(result, crawler_output_file, ignore_keys=('crawl_timestamp',))
             
             print(f"\n✓ Crawler complete! Found {len(video_links)} videos")
             print(f"  Results saved to: {crawler_output_file}")
@@ -207,8 +246,7 @@ Examples:
             
         except Exception as e:
             print(f"\n✗ Error during crawling: {e}")
-            import traceback
-            traceback.print_exc()
+            log.debug("Crawl step failed", exc_info=True)
             return 1
     else:
         # Skip crawling, use provided input file
@@ -236,6 +274,8 @@ Examples:
         output_file = args.output
     else:
         input_path = Path(input_file)
+        if input_path.suffix == '.gz':
+            input_path = input_path.with_suffix('')
         output_file = str(input_path.parent / f"{input_path.stem}_metadata.json")
     
     try:
@@ -256,11 +296,13 @@ Examples:
         extractor = TikTokVideoMetadataExtractor(
             headless=args.headless,
             delay=args.delay,
-            num_threads=args.threads
+            num_threads=args.threads,
+            pool=pool
         )
         
-        # Extract metadata using the threaded approach or sequential
-        if args.no_threading:
+        # Extract metadata using the threaded approach or sequential; a single
+        # video skips the task pool, gate and logger thread entirely
+        if args.no_threading or (len(video_links) == 1 and not args.resume):
             # Use sequential processing (extract_from_links will save automatically)
             print("\nUsing sequential processing (single thread)...")
             all_metadata = extractor.extract_from_links(
@@ -268,81 +310,48 @@ Examples:
                 output_file,
                 use_threading=False
             )
-            # Results are already saved by extract_from_links, skip manual save
-            save_results = False
+            # Results are already saved by extract_from_links; count them in a single pass
+            successful = 0
+            samples = []
+            for m in all_metadata:
+                if not m.get('error'):
+                    successful += 1
+                    if len(samples) < 3:
+                        samples.append(m)
+            total = len(all_metadata)
         else:
-            save_results = True
             # Use threaded approach
             num_threads = args.threads
-            chunk_size = len(video_links) // num_threads
-            remainder = len(video_links) % num_threads
-            
-            chunks = []
-            start_idx = 0
-            for i in range(num_threads):
-                current_chunk_size = chunk_size + (1 if i < remainder else 0)
-                end_idx = start_idx + current_chunk_size
-                chunks.append(video_links[start_idx:end_idx])
-                start_idx = end_idx
-            
-            print(f"\nDividing {len(video_links)} videos into {num_threads} threads:")
-            for i, chunk in enumerate(chunks, 1):
-                print(f"  Thread {i}: {len(chunk)} videos")
+            print(f"\nExtracting {len(video_links)} videos on {num_threads} threads...")
             
-            # Import threading components
-            from threading import Lock, Thread
-            import time
+            # One task per video, streamed to disk as each finishes; the full list
+            # is only kept when the Excel export needs it. Workers start immediately;
+            # the shared gate only slows them down once one runs into rate limiting
+            summary = extractor.extract_links_to_file(video_links, output_file, RateGate(),
+                                                      keep_results=bool(args.filter_excel),
+                                                      resume=args.resume)
+            all_metadata = summary['results']
+            successful = summary['successful']
+            samples = summary['samples']
+            total = summary['total']
             
-            # Create shared results list and lock
-            all_metadata = []
-            results_lock = Lock()
-            
-            # Create and start threads
-            threads = []
-            for thread_id in range(1, num_threads + 1):
-                if len(chunks[thread_id - 1]) > 0:
-                    from video_metadata_extractor import _process_chunk_in_thread
-                    thread = Thread(
-                        target=_process_chunk_in_thread,
-                        args=(
-                            chunks[thread_id - 1],
-                            thread_id,
-                            args.headless,
-                            args.delay,
-                            all_metadata,
-                            results_lock
-                        )
-                    )
-                    threads.append(thread)
-                    thread.start()
-                    time.sleep(1.5)  # Delay between thread starts
-            
-            # Wait for all threads to complete
-            print(f"\nWaiting for all {len(threads)} threads to complete...")
-            for thread in threads:
-                thread.join()
-            
-            print(f"\nAll threads completed. Total results: {len(all_metadata)}")
-        
-        # Save results (only if using threading, sequential mode saves automatically)
-        if save_results:
-            extractor.save_results(all_metadata, output_file)
+            print(f"\nAll threads completed. Total results: {total}")
+            if summary['resumed']:
+                print(f"Carried over from previous run: {summary['resumed']}")
         
         # Print summary
         print(f"\n{'='*80}")
         print("Extraction Summary:")
         print(f"{'='*80}")
-        print(f"Total videos processed: {len(all_metadata)}")
-        successful = sum(1 for m in all_metadata if not m.get('error'))
+        print(f"Total videos processed: {total}")
         print(f"Successfully extracted: {successful}")
-        print(f"Errors: {len(all_metadata) - successful}")
+        print(f"Errors: {total - successful}")
         print(f"\nResults saved to: {output_file}")
         
         # Show sample
-        if all_metadata:
+        if samples:
             print("\nSample extracted data:")
-            sample = [m for m in all_metadata if not m.get('error')][:3]
-            for m in sample:
+            for m in samples:
                 title = m.get('title') or 'N/A'
                 title_display = title[:50] + '...' if isinstance(title, str) and len(title) > 50 else title
                 print(f"  - @{m.get('username', 'N/A')}: {title_display}")
@@ -374,8 +383,7 @@ Examples:
         return 1
     except Exception as e:
         print(f"ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        log.debug("Extraction step failed", exc_info=True)
         return 1
     
     return 0
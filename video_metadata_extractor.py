@@ -4,150 +4,1048 @@ TikTok Video Metadata Extractor
 Extracts metadata from TikTok video links: title, description, username, engagement metrics.
 """
 
+import atexit
+import gzip
+import importlib.util
+import itertools
 import json
+import logging
+import mmap
 import time
 import re
 import os
+import queue
 import tempfile
 import random
-from typing import Dict, List, Optional
-from pathlib import Path
+import shutil
+import signal
+import sys
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Thread
-from xxlimited import Null
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+from threading import Condition, Lock, Thread, local
+
+from browser_pool import BrowserPool
+
+log = logging.getLogger(__name__)
 
 try:
-    import undetected_chromedriver as uc
     # from selenium import webdriver
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import (
         TimeoutException, NoSuchElementException, 
         WebDriverException, InvalidSessionIdException
     )
-    SELENIUM_AVAILABLE = True
+    # undetected_chromedriver (and webdriver_manager below) are slow to import, so
+    # only check they're installed here; _uc() imports on the first browser launch
+    SELENIUM_AVAILABLE = importlib.util.find_spec('undetected_chromedriver') is not None
 except ImportError:
     SELENIUM_AVAILABLE = False
+if not SELENIUM_AVAILABLE:
     print("Error: Please install required packages: pip install undetected-chromedriver selenium")
 
+WEBDRIVER_MANAGER_AVAILABLE = importlib.util.find_spec('webdriver_manager') is not None
 
-class TikTokVideoMetadataExtractor:
-    """Extracts metadata from TikTok video pages."""
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    # Cython lock for the short, rarely contended sections taken on every video
+    from fastrlock.rlock import FastRLock as _FastLock
+except ImportError:
+    _FastLock = Lock
+
+
+# Error text that means TikTok is throttling us rather than the video being broken
+_THROTTLE_MARKERS = ('429', 'too many requests', 'rate limit', 'captcha')
+
+# Driver-launch failures worth retrying (launch races, port / connection trouble)
+_LAUNCH_RECOVERABLE_RE = re.compile(
+    r'no such file|chromedriver|can ?not connect|session not created|connection refused|service|'
+    r'chromeoptions|reuse|127\.0\.0\.1|not reachable|unable to connect',
+    re.IGNORECASE
+)
+# Launch failures that mean Chrome is still starting up; these get a longer wait
+_SLOW_START_RE = re.compile(r'not reachable|cannot connect', re.IGNORECASE)
+# Page-load failures that only took out the tab; the browser itself is still usable
+_TAB_LOST_RE = re.compile(r'target window already closed|no such window|web view not found|tab crashed', re.IGNORECASE)
+# Page-load failures worth retrying with a fresh driver
+_SESSION_RECOVERABLE_RE = re.compile(
+    r'target window already closed|no such window|web view not found|session|connection|service',
+    re.IGNORECASE
+)
+
+# Progress checkpoints: append finished results to <output>_partial.jsonl in
+# batches of this many records, or once the oldest unsaved result is this old
+_PARTIAL_BATCH_SIZE = 32
+_PARTIAL_FLUSH_SECONDS = 2.0
+
+# Rehydration JSON fields we bucket in one walk of the data
+_NUMBER_FIELDS = frozenset(('diggCount', 'commentCount', 'shareCount', 'playCount', 'collectCount',
+                            'collectionCount', 'savedCount', 'bookmarkCount', 'favoriteCount', 'collect'))
+_STRING_FIELDS = frozenset(('uniqueId', 'text'))
+_METRIC_FIELDS = ('like_count', 'comment_count', 'share_count', 'view_count', 'archive_count')
+# Fields shown on each per-video progress line (every metadata dict carries them)
+_PROGRESS_FIELDS = itemgetter('username', 'like_count', 'view_count')
+# SIGI_STATE ItemModule stats key per metric
+_SIGI_STAT_KEYS = (
+    ('like_count', 'diggCount'), ('comment_count', 'commentCount'), ('share_count', 'shareCount'),
+    ('view_count', 'playCount'), ('archive_count', 'collectCount'),
+)
+# Stats keys that may hold the archive (save) count, in priority order
+_ARCHIVE_STAT_KEYS = ('collectCount', 'collectionCount', 'savedCount', 'bookmarkCount', 'favoriteCount')
+_COLLECT_FIELDS = _ARCHIVE_STAT_KEYS + ('collect',)
+
+# Compiled once here rather than per call on the extraction hot path
+_URL_USERNAME_RE = re.compile(r'@([^/]+)')
+_VIDEO_ID_RE = re.compile(r'/video/(\d+)')
+_HASHTAG_RE = re.compile(r'#([A-Za-z0-9_]+)')
+_COUNT_TEXT_RE = re.compile(r'(\d+(?:\.\d+)?[KMB]?)')
+_PARSE_COUNT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([KMB]?)$')
+_COUNT_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000000, 'B': 1000000000}
+_META_OG_DESC_RE = re.compile(r'<meta[^>]*property=["\']og:description["\'][^>]*content=["\']([^"\']+)["\']')
+_REHYDRATION_SCRIPT_RE = re.compile(
+    r'<script[^>]*id=["\']__UNIVERSAL_DATA_FOR_REHYDRATION__["\'][^>]*>(.*?)</script>', re.DOTALL
+)
+# Every page_source count field in one pass: stats fields in groups 1/2, any
+# archive-count field name (case-insensitive, quoted or not) in group 3
+_PAGE_COUNTS_RE = re.compile(
+    r'"(diggCount|likeCount|commentCount|shareCount|playCount|viewCount)":\s*(\d+)'
+    r'|(?i:"collect"|(?:collectCount|collectionCount|savedCount|bookmarkCount|favoriteCount)["\']?)\s*:\s*(\d+)'
+)
+_PAGE_COUNT_FIELDS = {
+    'diggCount': 'like_count', 'likeCount': 'like_count',
+    'commentCount': 'comment_count', 'shareCount': 'share_count',
+    'playCount': 'view_count', 'viewCount': 'view_count',
+}
+# Literal keys per stats metric, for a cheap substring probe before the scan
+_PAGE_COUNT_KEYS = {
+    'like_count': ('"diggCount"', '"likeCount"'),
+    'comment_count': ('"commentCount"',),
+    'share_count': ('"shareCount"',),
+    'view_count': ('"playCount"', '"viewCount"'),
+    'archive_count': (),
+}
+
+# Resources never needed for metadata extraction (Network.setBlockedURLs wildcards):
+# media, images and fonts, plus the XHRs TikTok fires after the document (comments,
+# recommendations, live, telemetry) - the metadata is all in the initial HTML
+_BLOCKED_URL_PATTERNS = (
+    '*.mp4', '*.m4s', '*.webm', '*.mp3', '*.webp', '*.jpg', '*.jpeg', '*.png', '*.gif',
+    '*.woff', '*.woff2', '*.ttf', '*tiktokcdn.com/*.mp4*', '*/video/tos/*',
+    '*/api/comment/*', '*/api/related/*', '*/api/recommend/*', '*/api/im/*', '*/webcast/*',
+    '*mon.tiktokv.com/*', '*mcs.tiktokw.us/*', '*/monitor_browser/*',
+)
+
+# Plain-HTTP fast path: the rehydration JSON (or, on older pages, SIGI_STATE) is
+# embedded in the initial HTML
+_REHYDRATION_SCRIPT_BYTES_RE = re.compile(
+    rb'id=["\']__UNIVERSAL_DATA_FOR_REHYDRATION__["\'][^>]*>(.*?)</script>', re.DOTALL
+)
+_SIGI_STATE_SCRIPT_BYTES_RE = re.compile(
+    rb'id=["\']SIGI_STATE["\'][^>]*>(.*?)</script>', re.DOTALL
+)
+_USER_AGENTS = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
+)
+_HTTP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+# One keep-alive session per thread (requests.Session isn't documented as thread-safe)
+_http_local = local()
+
+# First username link/text and first non-empty description, by selector priority
+_JS_PAGE_CANDIDATES = """
+    const result = {};
+    const userSelectors = ['a[href*="/@"]', '[data-e2e*="browse-username"]',
+                           '[class*="username"]', 'h2[data-e2e*="browse-username"]'];
+    outer:
+    for (const selector of userSelectors) {
+        for (const el of Array.from(document.querySelectorAll(selector)).slice(0, 5)) {
+            const href = el.href || el.getAttribute('href');
+            if (href && href.includes('/@')) { result.userHref = href; break outer; }
+            const text = (el.innerText || '').trim();
+            if (text.startsWith('@')) { result.userText = text; break outer; }
+        }
+    }
+    const descSelectors = ['[data-e2e="browse-video-desc"]', '[class*="video-desc"]',
+                           '[class*="description"]', 'h1', 'h2',
+                           'meta[property="og:description"]', 'meta[name="description"]'];
+    for (const selector of descSelectors) {
+        const el = document.querySelector(selector);
+        if (!el) continue;
+        const text = (el.tagName === 'META' ? el.getAttribute('content') || '' : el.innerText || '').trim();
+        if (text) { result.description = text; break; }
+    }
+    return result;
+"""
+
+# Parses the rehydration JSON script tag (usually the only place the data is)
+_JS_PARSE_REHYDRATION = """(() => {
+        const el = document.getElementById('__UNIVERSAL_DATA_FOR_REHYDRATION__');
+        if (!el) return null;
+        try { return JSON.parse(el.textContent); } catch (e) { return null; }
+    })()"""
+
+# Registered on every new document: parse the rehydration JSON as soon as the HTML
+# is in, overlapping it with the rest of the page load
+_JS_REGISTER_EXTRACTION = """
+    window.__tt_extracted = new Promise(resolve => {
+        const parse = () => resolve(""" + _JS_PARSE_REHYDRATION + """);
+        if (document.readyState !== 'loading') parse();
+        else document.addEventListener('DOMContentLoaded', parse, {once: true});
+    });
+"""
+
+# Async getter: pre-parsed rehydration data plus globals, meta tags and page text,
+# which are read now since TikTok fills them in after DOMContentLoaded
+_JS_READ_EXTRACTION = """
+    const done = arguments[arguments.length - 1];
+    (window.__tt_extracted || Promise.resolve(null)).catch(() => null).then(parsed => {
+        const result = {};
+        
+        // Try __UNIVERSAL_DATA_FOR_REHYDRATION__ (parse now if the driver had no registered script)
+        result.universal_data = window.__UNIVERSAL_DATA_FOR_REHYDRATION__ || parsed || """ + _JS_PARSE_REHYDRATION + """;
+        
+        // Try to get video metadata from page (global, else the SIGI_STATE script tag)
+        if (window.SIGI_STATE) {
+            result.sigi_state = window.SIGI_STATE;
+        } else {
+            const sigi = document.getElementById('SIGI_STATE');
+            if (sigi) {
+                try { result.sigi_state = JSON.parse(sigi.textContent); } catch (e) {}
+            }
+        }
+        
+        // Try to get from meta tags
+        const metaTags = {};
+        document.querySelectorAll('meta').forEach(meta => {
+            const prop = meta.getAttribute('property') || meta.getAttribute('name');
+            const content = meta.getAttribute('content');
+            if (prop && content) {
+                metaTags[prop] = content;
+            }
+        });
+        result.metaTags = metaTags;
+        
+        // Get page text for regex extraction
+        result.pageText = document.body ? document.body.innerText : '';
+        
+        done(result);
+    });
+"""
+
+# Visible-element fallbacks per metric, in priority order (CSS attribute-substring
+# selectors run on the browser's native selector engine, unlike contains() XPaths).
+# CSS can't match on text content, so the text-label matches stay XPaths (the
+# entries starting with '/') and only run after the attribute selectors
+_VISIBLE_COUNT_SELECTORS = {
+    'like_count': ['[data-e2e*="like"]', "//*[contains(text(), 'Like')]"],
+    'comment_count': ['[data-e2e*="comment"]', "//*[contains(text(), 'Comment')]"],
+    'share_count': ['[data-e2e*="share"]', "//*[contains(text(), 'Share')]"],
+    'view_count': ['[data-e2e*="view"]', "//*[contains(text(), 'View')]"],
+    'archive_count': [
+        '[data-e2e*="collect"]',
+        '[data-e2e*="archive"]',
+        '[data-e2e*="save"]',
+        '[data-e2e*="bookmark"]',
+        '[aria-label*="collect"], [aria-label*="save"]',
+        "//button[contains(., 'Collect') or contains(., 'Save')]",
+        '[class*="collect"], [class*="save"]',
+    ],
+}
+
+# Given {field: [selector, ...]}, returns {field: [text, ...]} for the first 5 matches of
+# each CSS selector or XPath; archive-count texts include the parent's text, where the
+# number usually is
+_JS_VISIBLE_COUNT_TEXTS = """
+    const wanted = arguments[0];
+    const out = {};
+    const firstMatches = (selector) => {
+        if (!selector.startsWith('/')) {
+            return Array.from(document.querySelectorAll(selector)).slice(0, 5);
+        }
+        const snap = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < Math.min(snap.snapshotLength, 5); i++) {
+            nodes.push(snap.snapshotItem(i));
+        }
+        return nodes;
+    };
+    for (const field of Object.keys(wanted)) {
+        const texts = [];
+        for (const selector of wanted[field]) {
+            for (const el of firstMatches(selector)) {
+                let text = (el.innerText || el.textContent || '').trim();
+                if (field === 'archive_count' && el.parentElement) {
+                    text += ' ' + (el.parentElement.innerText || '').trim();
+                }
+                texts.push(text);
+            }
+        }
+        out[field] = texts;
+    }
+    return out;
+"""
+
+# True once a video page has its data in the DOM (rehydration JSON or og:description)
+_JS_PAGE_READY = (
+    "return !!(window.__UNIVERSAL_DATA_FOR_REHYDRATION__"
+    " || document.getElementById('__UNIVERSAL_DATA_FOR_REHYDRATION__')"
+    " || document.querySelector('meta[property=\"og:description\"]'))"
+)
+
+
+class RateGate:
+    """
+    Backoff shared by extractor threads.
+    
+    Workers pass through without waiting until one of them sees throttling; each
+    throttle signal doubles the shared delay (up to max_delay) and each clean
+    result halves it again.
+    """
+    
+    def __init__(self, max_delay: float = 60.0):
+        self._delay = 0.0
+        self._max_delay = max_delay
+        self._lock = _FastLock()
+    
+    def wait(self):
+        """Sleep for the current backoff delay, if any."""
+        with self._lock:
+            delay = self._delay
+        if delay > 0:
+            time.sleep(delay)
+    
+    def record_throttle(self):
+        """Back off after a worker observed rate limiting."""
+        with self._lock:
+            self._delay = min(self._max_delay, max(1.0, self._delay * 2))
+    
+    def record_success(self):
+        """Relax the backoff after a normal response."""
+        with self._lock:
+            self._delay = self._delay / 2 if self._delay > 1.0 else 0.0
+
+
+# Progress lines from worker threads; while a logger thread runs they are queued
+# and written in batches, so workers never wait on the stdout lock
+_log_queue = queue.SimpleQueue()
+_logger_thread = None
+
+
+def _log(message: str):
+    """print() for per-video progress: queued while a logger thread is running."""
+    if _logger_thread is not None:
+        _log_queue.put(message)
+    else:
+        print(message)
+
+
+def _logger_loop():
+    """Write queued progress lines until the None sentinel, one flush per batch."""
+    stopped = False
+    while not stopped:
+        lines = [_log_queue.get()]
+        while True:
+            try:
+                lines.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if None in lines:
+            stopped = True
+            lines = lines[:lines.index(None)]
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+
+
+@contextmanager
+def _background_logging():
+    """Route _log() through a logger thread for the duration of a with-block."""
+    global _logger_thread
+    if _logger_thread is not None:
+        # Already running (nested use); the outer block stops it
+        yield
+        return
+    _logger_thread = Thread(target=_logger_loop, daemon=True)
+    _logger_thread.start()
+    try:
+        yield
+    finally:
+        thread, _logger_thread = _logger_thread, None
+        _log_queue.put(None)
+        thread.join()
+
+
+class ConcurrencyGate:
+    """
+    Adaptive cap on how many extraction tasks run at once.
+    
+    Starts with every worker admitted. Each window, the completion rate is
+    compared with the previous window's: a drop of more than `margin` parks one
+    more worker (it blocks in acquire() until re-admitted), and a rise of more
+    than `margin` while workers are parked lets one back in. Every change is
+    then checked against the next window and undone unless it paid off: a
+    parked worker stays parked only if the others sped up enough to cover for
+    it, and a re-admitted one stays only if the rate rose again. Past the knee,
+    extra Chromes only add contention, so this settles near the worker count
+    the machine can sustain instead of drifting down on noise.
+    """
+    
+    def __init__(self, max_workers: int, window: float = 30.0, min_workers: int = 1,
+                 margin: float = 0.05):
+        self._max = max(1, max_workers)
+        self._min = max(1, min(min_workers, self._max))
+        self._limit = self._max
+        self._active = 0
+        self._window = window
+        self._margin = margin
+        self._window_start = time.monotonic()
+        self._completed = 0
+        self._last_rate = None
+        self._last_change = 0  # -1 / +1 when the cap moved at the end of the last window
+        self._cond = Condition()
+    
+    def acquire(self):
+        """Wait for a free slot under the current cap."""
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+    
+    def release(self):
+        """Free a slot, and re-tune the cap when a window has elapsed."""
+        with self._cond:
+            self._active -= 1
+            self._completed += 1
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed >= self._window:
+                self._retune(self._completed / elapsed)
+                self._completed = 0
+                self._window_start = now
+            self._cond.notify_all()
+    
+    def _retune(self, rate: float):
+        """Move the cap one step based on this window's completion rate (call with _cond held)."""
+        last_rate, change = self._last_rate, self._last_change
+        self._last_rate, self._last_change = rate, 0
+        if last_rate is None:
+            return
+        lower, upper = last_rate * (1 - self._margin), last_rate * (1 + self._margin)
+        if change < 0:
+            # The remaining workers' per-worker rate has to rise enough to make up
+            # for the parked one; otherwise the drop was noise, not contention
+            if rate < lower:
+                self._limit += 1
+                self._last_rate = None  # Re-measure at the restored cap
+                _log(f"  Parking a worker didn't help ({rate:.2f} videos/s), running {self._limit} workers")
+        elif change > 0:
+            if rate <= upper:
+                self._limit -= 1
+                self._last_rate = None
+                _log(f"  Extra worker didn't help ({rate:.2f} videos/s), running {self._limit} workers")
+        elif rate < lower and self._limit > self._min:
+            self._limit -= 1
+            self._last_change = -1
+            _log(f"  Throughput fell to {rate:.2f} videos/s, running {self._limit} workers")
+        elif rate > upper and self._limit < self._max:
+            self._limit += 1
+            self._last_change = 1
+            _log(f"  Throughput rose to {rate:.2f} videos/s, running {self._limit} workers")
+    
+    @contextmanager
+    def slot(self):
+        """Hold a slot for the duration of a with-block."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# Metadata lives in the DOM; images and media are dead weight
+_POOL_CHROME_PREFS = {'profile.managed_default_content_settings.images': 2}
+
+
+@lru_cache(maxsize=2)
+def _pool_chrome_arguments(headless: bool) -> tuple:
+    """Command-line switches for pooled extractor Chromes, built once per headless mode."""
+    arguments = ['--headless'] if headless else []
+    arguments += [
+        '--disable-blink-features=AutomationControlled',
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+        '--blink-settings=imagesEnabled=false',
+        # Pool drivers run num_threads at a time, so keep each Chrome to as few
+        # processes as possible: no per-site renderers, extensions or background services
+        '--disable-features=IsolateOrigins,site-per-process',
+        '--renderer-process-limit=2',
+        '--disable-extensions',
+        '--disable-background-networking',
+    ]
+    return tuple(arguments)
+
+
+# Chrome / chromedriver PIDs of every driver not yet quit, killed outright at exit so
+# a hung Chrome can't outlive the run (or stall it in Selenium's quit handshake)
+_live_driver_pids = set()
+_live_driver_pids_lock = Lock()
+# Temporary Chrome profile roots, removed at exit once their browsers are dead
+_exit_cleanup_dirs = []
+
+
+def _process_tree(pids) -> set:
+    """pids plus every process below them (renderers, GPU and utility helpers); Linux only."""
+    children = defaultdict(list)
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return set(pids)
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue  # Exited while scanning
+        # Parent PID is the second field after the command name, which may contain spaces
+        children[int(stat[stat.rindex(b')') + 2:].split()[1])].append(int(entry))
+    tree = set()
+    stack = list(pids)
+    while stack:
+        pid = stack.pop()
+        if pid not in tree:
+            tree.add(pid)
+            stack.extend(children.get(pid, ()))
+    return tree
+
+
+def _kill_leftover_drivers():
+    """
+    atexit hook: SIGKILL every browser process tree whose driver was never quit,
+    then delete the profile dirs.
+    
+    Both happen here, in that order, so no Chrome is still writing to a profile
+    while it is removed (separately registered handlers would run in reverse).
+    """
+    with _live_driver_pids_lock:
+        pids = list(_live_driver_pids)
+        _live_driver_pids.clear()
+    if pids:
+        # Collect the whole tree first: once a parent dies its children are reparented
+        for pid in _process_tree(pids):
+            try:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                pass  # Already exited
+    for path in _exit_cleanup_dirs:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+atexit.register(_kill_leftover_drivers)
+
+
+def _track_driver_processes(driver):
+    """Register driver's processes for the exit-time reaper until driver.quit() runs."""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    pids = {pid for pid in (getattr(driver, 'browser_pid', None), getattr(process, 'pid', None)) if pid}
+    with _live_driver_pids_lock:
+        _live_driver_pids.update(pids)
+    quit_driver = driver.quit
+    
+    def quit_and_untrack():
+        try:
+            quit_driver()
+        finally:
+            with _live_driver_pids_lock:
+                _live_driver_pids.difference_update(pids)
+    
+    driver.quit = quit_and_untrack
+
+
+def _pin_to_cpus(driver, slot: int, slots: int):
+    """
+    Restrict a driver's Chrome and chromedriver to CPU group slot % slots.
+    
+    Linux only. Renderers Chrome starts afterwards inherit the mask, so each
+    Chrome's processes keep to the same cores instead of migrating across all of them.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    cpus = sorted(os.sched_getaffinity(0))
+    groups = max(1, min(slots, len(cpus)))
+    mask = set(cpus[slot % groups::groups])
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    for pid in (getattr(driver, 'browser_pid', None), getattr(process, 'pid', None)):
+        if pid:
+            try:
+                os.sched_setaffinity(pid, mask)
+            except OSError:
+                pass  # Process already gone or not ours to change
+
+
+def _reset_driver_state(driver):
+    """Clear cookies and storage between videos so a pooled driver starts each task clean (cache stays warm)."""
+    driver.delete_all_cookies()
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    # Park on a blank page so the last video's scripts and requests stop while idle
+    driver.get('about:blank')
+
+
+def _block_heavy_resources(driver):
+    """Refuse video/image/font requests via CDP; TikTok autoplays tens of MB per page otherwise."""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(_BLOCKED_URL_PATTERNS)})
+    except Exception as e:
+        print(f"  Warning: Could not block media requests: {e}")
+
+
+def _install_extraction_script(driver):
+    """Register _JS_REGISTER_EXTRACTION to run on every page the driver loads."""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _JS_REGISTER_EXTRACTION})
+    except Exception as e:
+        print(f"  Warning: Could not register extraction script: {e}")
+
+
+def _reopen_tab(driver) -> bool:
+    """
+    Swap a closed/crashed tab for a fresh one in the same browser instead of relaunching Chrome.
+    
+    Returns:
+        False if the browser has no usable window left either
+    """
+    try:
+        handles = driver.window_handles
+        if not handles:
+            return False
+        driver.switch_to.window(handles[-1])
+        driver.switch_to.new_window('tab')
+        fresh = driver.current_window_handle
+        for handle in handles:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(fresh)
+    except Exception:
+        return False
+    # CDP setup is per tab, so the new one needs it again
+    _block_heavy_resources(driver)
+    _install_extraction_script(driver)
+    return True
+
+
+# chromedriver binary resolved once per process and shared by every driver launch
+_chromedriver_lock = Lock()
+_chromedriver_resolved = False
+_chromedriver_path = None
+
+
+@lru_cache(maxsize=1)
+def _uc():
+    """The undetected_chromedriver module, imported on first use."""
+    import undetected_chromedriver as uc
+    return uc
+
+
+def _get_chromedriver_path() -> Optional[str]:
+    """
+    Resolve the chromedriver binary via webdriver_manager on first call, then reuse it.
+    
+    Returns None (letting undetected_chromedriver fetch its own) when
+    webdriver_manager is missing or the lookup fails.
+    """
+    global _chromedriver_resolved, _chromedriver_path
+    with _chromedriver_lock:
+        if not _chromedriver_resolved:
+            _chromedriver_resolved = True
+            if WEBDRIVER_MANAGER_AVAILABLE:
+                try:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    _chromedriver_path = ChromeDriverManager().install()
+                except Exception as e:
+                    print(f"Warning: Could not resolve chromedriver via webdriver_manager: {e}")
+        return _chromedriver_path
+
+
+def _http_session():
+    """Return this thread's keep-alive requests session, creating it on first use."""
+    session = getattr(_http_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(_HTTP_HEADERS)
+        _http_local.session = session
+    return session
+
+
+def _try_http_fetch(url: str) -> Optional[Dict]:
+    """
+    Fetch a video page without a browser and return its itemStruct.
+    
+    Returns None when the page doesn't carry the video data (bot challenge,
+    removed video, network error), so the caller can fall back to Selenium.
+    """
+    if not REQUESTS_AVAILABLE:
+        return None
+    try:
+        response = _http_session().get(url, headers={'User-Agent': random.choice(_USER_AGENTS)}, timeout=15)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    item = None
+    match = _REHYDRATION_SCRIPT_BYTES_RE.search(response.content)
+    if match:
+        item = _rehydration_item(_loads_or_none(match.group(1)))
+    else:
+        match = _SIGI_STATE_SCRIPT_BYTES_RE.search(response.content)
+        if match:
+            item = _sigi_item(_loads_or_none(match.group(1)), url)
+    if not isinstance(item, dict) or not isinstance(item.get('stats'), dict):
+        return None
+    return item
+
+
+def _loads_or_none(raw):
+    """Parse an embedded JSON blob, or None if it is truncated/malformed."""
+    try:
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _jsonl_line(record) -> bytes:
+    """One compact JSON line (with newline) for the progress checkpoint."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record) + b'\n'
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _dumps_indented(obj) -> bytes:
+    """obj as 2-space indented JSON, the same layout save_results writes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _normalize_video(video: Dict) -> Dict:
+    """Coerce archive_count to int and clean/dedupe hashtags, in place, before saving."""
+    if video.get('archive_count') is not None:
+        try:
+            video['archive_count'] = int(video['archive_count'])
+        except (ValueError, TypeError):
+            video['archive_count'] = None
+    hashtags = video.get('hashtags')
+    if isinstance(hashtags, list):
+        # dict.fromkeys dedups while keeping first-seen order
+        video['hashtags'] = [tag for tag in dict.fromkeys(
+            tag.lstrip('#').lower() for tag in hashtags if isinstance(tag, str)) if tag]
+    else:
+        video['hashtags'] = []
+    return video
+
+
+# Captions longer than this (i.e. whole-page text) bypass the hashtag cache
+_HASHTAG_CACHE_MAX_TEXT = 4096
+
+
+def _to_int(value) -> Optional[int]:
+    """int(value), or None for missing / non-numeric values."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _sigi_item(sigi_state, video_url: str) -> Optional[Dict]:
+    """The ItemModule entry for video_url from a SIGI_STATE payload, if there is one."""
+    if not isinstance(sigi_state, dict):
+        return None
+    items = sigi_state.get('ItemModule')
+    if not isinstance(items, dict) or not items:
+        return None
+    match = _VIDEO_ID_RE.search(video_url)
+    item = items.get(match.group(1)) if match else None
+    if item is None and len(items) == 1:
+        item = next(iter(items.values()))
+    return item if isinstance(item, dict) else None
+
+
+@lru_cache(maxsize=4096)
+def _parse_count(count_str: str) -> Optional[int]:
+    """Cached body of parse_count; TikTok only shows a small set of distinct count strings."""
+    match = _PARSE_COUNT_RE.match(count_str.strip().upper())
+    if not match:
+        return None
+    return int(float(match.group(1)) * _COUNT_MULTIPLIERS[match.group(2)])
+
+
+@lru_cache(maxsize=1024)
+def _hashtags_in_text(text: str) -> tuple:
+    """Unique lowercased hashtags (without #) in text, in first-seen order; cached since the same captions repeat across a batch."""
+    return tuple(dict.fromkeys(match.lower() for match in _HASHTAG_RE.findall(text)))
+
+
+def _is_recoverable_launch_error(e: Exception) -> bool:
+    """Whether a driver-creation failure is worth another attempt."""
+    if isinstance(e, (ConnectionError, FileNotFoundError)):
+        return True
+    return _LAUNCH_RECOVERABLE_RE.search(str(e)) is not None
+
+
+def _is_recoverable_session_error(e: Exception) -> bool:
+    """Whether a page-load failure is worth retrying on a fresh driver."""
+    if isinstance(e, InvalidSessionIdException):
+        return True
+    return _SESSION_RECOVERABLE_RE.search(str(e)) is not None
+
+
+def _find_in_dict(obj, key):
+    """
+    Depth-first search of nested dicts/lists for the first non-None value under key.
+
+    key may also be a tuple of alternative names, so one traversal finds
+    whichever of them comes first. Iterative (explicit stack) so deeply
+    nested TikTok payloads don't pay for Python recursion.
+    """
+    keys = (key,) if isinstance(key, str) else key
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            found = False
+            for k in keys:
+                if k in node:
+                    found = True
+                    if node[k] is not None:
+                        return node[k]
+            if found:
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def _archive_stat(stats: Dict):
+    """First archive-count value present in a stats dict (0 counts as present)."""
+    return next((stats[k] for k in _ARCHIVE_STAT_KEYS if stats.get(k) is not None), None)
+
+
+def _rehydration_item(data) -> Optional[Dict]:
+    """The itemStruct from rehydration JSON: the known path first, else a full search."""
+    try:
+        item = data['__DEFAULT_SCOPE__']['webapp.video-detail']['itemInfo']['itemStruct']
+    except (KeyError, TypeError):
+        item = None
+    if not isinstance(item, dict):
+        item = _find_in_dict(data, 'itemStruct')
+    return item if isinstance(item, dict) else None
+
+
+def _collect_fields(obj):
+    """
+    Walk nested dicts/lists once, bucketing every _NUMBER_FIELDS / _STRING_FIELDS value.
+
+    Values come out in document order, the same order a scan of the serialized
+    JSON would see them: (key, value) pairs are visited depth-first, so a field
+    nested under an earlier key comes before a later sibling's.
+    """
+    numbers = defaultdict(list)
+    strings = defaultdict(list)
+    stack = [(None, obj)]
+    while stack:
+        k, v = stack.pop()
+        if k in _NUMBER_FIELDS:
+            if isinstance(v, int) and not isinstance(v, bool):
+                numbers[k].append(v)
+        elif k in _STRING_FIELDS:
+            if isinstance(v, str) and v:
+                strings[k].append(v)
+        # Children pushed in reverse so they pop in order
+        if isinstance(v, dict):
+            stack.extend(reversed(v.items()))
+        elif isinstance(v, list):
+            stack.extend((None, item) for item in reversed(v))
+    return numbers, strings
+
+
+def _looks_throttled(metadata: Dict) -> bool:
+    """Guess whether an extraction result came from a rate-limit / captcha page."""
+    error = (metadata.get('error') or '').lower()
+    if error:
+        return any(marker in error for marker in _THROTTLE_MARKERS)
+    # A throttled page loads fine but carries no video data at all
+    return (metadata.get('username') is None
+            and metadata.get('like_count') is None
+            and metadata.get('view_count') is None)
+
+
+def _is_driver_alive(driver) -> bool:
+    """
+    Check locally that driver has a session and its chromedriver process is running.
     
-    def __init__(self, headless: bool = False, delay: float = 2.0, num_threads: int = 3):
+    No CDP round-trip, so it is cheap enough to call before every operation; a
+    browser that died under a live chromedriver surfaces as InvalidSessionIdException /
+    WebDriverException on the next command, which the retry loop handles.
+    """
+    if driver is None or getattr(driver, 'session_id', None) is None:
+        return False
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process is not None and process.poll() is None
+
+
+class ChromeLauncher:
+    """
+    Driver factory for pooled extractor Chromes (pass it to BrowserPool).
+    
+    Launches are serialized and each live driver gets its own Chrome profile
+    dir, reused across relaunches so they keep a warm cache and failed
+    retries don't litter /tmp.
+    """
+    
+    def __init__(self, headless: bool = False, slots: int = 3, pin_cpus: bool = False):
         """
-        Initialize the extractor.
+        Initialize the launcher.
         
         Args:
-            headless: Run browser in headless mode
-            delay: Delay between requests in seconds
-            num_threads: Number of parallel threads for processing (default: 3, reduced to prevent Chrome conflicts)
+            headless: Run browsers in headless mode
+            slots: Number of drivers expected to be live at once (CPU groups for pin_cpus)
+            pin_cpus: Give each Chrome its own share of the CPUs (Linux only)
         """
         self.headless = headless
-        self.delay = delay
-        self.num_threads = num_threads
-        self.driver = None
-        self._progress_lock = Lock()
-        self._file_save_lock = Lock()  # Separate lock for file operations
+        self.slots = slots
+        self.pin_cpus = pin_cpus
         self._driver_creation_lock = Lock()  # Lock to serialize driver creation
-        self._processed_count = 0
-        self._completed_count = 0  # Thread-safe completed counter
-
-    def setup_driver(self):
-        """Setup undetected ChromeDriver using webdriver_manager."""
-        if not SELENIUM_AVAILABLE:
-            raise ImportError("Please install required packages: pip install undetected-chromedriver selenium webdriver-manager")
+        self._profile_lock = Lock()
+        self._profile_root = None
+        self._free_profiles = []
+        self._leased_profiles = set()
+    
+    def _lease_profile_dir(self) -> str:
+        """Hand out a Chrome profile dir no live driver is using, creating one if all are taken."""
+        with self._profile_lock:
+            if self._profile_root is None:
+                self._profile_root = tempfile.mkdtemp(prefix='tt_profiles_')
+                _exit_cleanup_dirs.append(self._profile_root)
+            if self._free_profiles:
+                # LIFO: the most recently used profile has the warmest cache
+                profile_dir = self._free_profiles.pop()
+            else:
+                # With none free, every existing dir is leased, so this name is unused
+                profile_dir = os.path.join(self._profile_root, str(len(self._leased_profiles)))
+                os.makedirs(profile_dir, exist_ok=True)
+            self._leased_profiles.add(profile_dir)
+            return profile_dir
+    
+    def _release_profile_dir(self, profile_dir: str):
+        """Return a profile dir for reuse (safe to call more than once)."""
+        with self._profile_lock:
+            if profile_dir in self._leased_profiles:
+                self._leased_profiles.remove(profile_dir)
+                self._free_profiles.append(profile_dir)
+    
+    def _bind_profile_dir(self, driver, profile_dir: str):
+        """Make driver.quit() hand its profile dir back, whoever ends up quitting it."""
+        quit_driver = driver.quit
         
-        # Use webdriver_manager to get the ChromeDriver path
-        # driver_path = ChromeDriverManager().install()
+        def quit_and_release():
+            try:
+                quit_driver()
+            finally:
+                self._release_profile_dir(profile_dir)
         
-        options = uc.ChromeOptions()
-        if self.headless:
-            options.add_argument('--headless')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-
-        print("Launching Chrome browser...")
-        # undetected_chromedriver will use the driver from webdriver_manager
-        self.driver = uc.Chrome(options=options)
-        self.driver.set_page_load_timeout(60)
-    
-    def _is_driver_alive(self, driver) -> bool:
-        """Check if driver is still alive and responsive."""
-        if driver is None:
-            return False
-        try:
-            # Try to get current URL - this will fail if driver is dead
-            driver.current_url
-            return True
-        except (InvalidSessionIdException, WebDriverException, AttributeError, Exception):
-            return False
+        driver.quit = quit_and_release
     
-    def _create_driver(self, max_retries: int = 3):
+    def __call__(self, max_retries: int = 3):
         """
-        Create a new browser driver instance (thread-safe - each thread gets its own driver).
+        Launch a new browser driver (thread-safe - each caller gets its own driver).
         Includes retry logic for common driver creation errors.
         """
         if not SELENIUM_AVAILABLE:
             raise ImportError("Please install required packages: pip install undetected-chromedriver selenium webdriver-manager")
         
-        # Use webdriver_manager to get the ChromeDriver path
-        # driver_path = ChromeDriverManager().install()
-        
-        # Helper function to create ChromeOptions (must create new instance each time)
+        # Helper function to create ChromeOptions (must create new instance each time:
+        # undetected_chromedriver refuses an options object that already launched)
         def _create_options():
-            options = uc.ChromeOptions()
-            if self.headless:
-                options.add_argument('--headless')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
+            options = _uc().ChromeOptions()
+            for argument in _pool_chrome_arguments(self.headless):
+                options.add_argument(argument)
+            options.add_experimental_option('prefs', dict(_POOL_CHROME_PREFS))
+            # driver.get returns at DOMContentLoaded; _JS_PAGE_READY covers the data
+            options.page_load_strategy = 'eager'
             
             return options
         
         # Retry logic for driver creation errors
         # Use lock to serialize driver creation and prevent too many simultaneous Chrome instances
+        # (the lock alone staggers launches: each one starts as soon as the last is up)
         with self._driver_creation_lock:
-            # Add longer random delay to stagger driver creation attempts and allow Chrome processes to settle
-            time.sleep(random.uniform(0.5, 1.5))
-            
             last_error = None
             driver = None
             for attempt in range(max_retries):
+                profile_dir = None
                 try:
                     # Create new ChromeOptions for each attempt (cannot reuse)
                     options = _create_options()
                     
-                    # Add unique user data dir to prevent conflicts
-                    user_data_dir = tempfile.mkdtemp(prefix='chrome_profile_')
-                    options.add_argument(f'--user-data-dir={user_data_dir}')
+                    # Profile dir no other live driver is using, to prevent conflicts
+                    profile_dir = self._lease_profile_dir()
+                    options.add_argument(f'--user-data-dir={profile_dir}')
                     
                     # Each thread creates its own driver - no shared state, so no race condition
                     # Use subprocess for better isolation and stability
-                    # Use webdriver_manager to get the driver path
-                    driver = uc.Chrome(
+                    # Reuse the chromedriver binary resolved once by webdriver_manager
+                    driver = _uc().Chrome(
                         options=options, 
                         version_main=None,
                         use_subprocess=True,  # Better isolation, helps with "not reachable" errors
-                        # driver_executable_path=driver_path
+                        driver_executable_path=_get_chromedriver_path()
                     )
+                    self._bind_profile_dir(driver, profile_dir)
+                    _track_driver_processes(driver)
+                    if self.pin_cpus:
+                        # Profile dirs are numbered per live driver slot, so live
+                        # drivers land on different CPU groups
+                        _pin_to_cpus(driver, int(os.path.basename(profile_dir)), self.slots)
                     driver.set_page_load_timeout(60)
+                    _block_heavy_resources(driver)
+                    _install_extraction_script(driver)
                     
-                    # Wait a bit for Chrome to fully start and become reachable
-                    time.sleep(1.0)
-                    
-                    # Verify driver is working with retries
+                    # Verify driver is working with retries (the CDP calls above
+                    # already needed it reachable, so this normally passes at once)
                     max_verify_attempts = 3
                     for verify_attempt in range(max_verify_attempts):
-                        if self._is_driver_alive(driver):
+                        if _is_driver_alive(driver):
                             # Double check by trying to get a property
                             try:
                                 _ = driver.current_url
                                 return driver
-                            except:
+                            except WebDriverException:
                                 if verify_attempt < max_verify_attempts - 1:
                                     time.sleep(0.5)
                                     continue
@@ -161,34 +1059,28 @@ class TikTokVideoMetadataExtractor:
                                 # Clean up failed driver
                                 try:
                                     driver.quit()
-                                except:
+                                except Exception:
                                     pass
                                 raise WebDriverException("Driver created but not reachable")
                         
                 except (WebDriverException, OSError, FileNotFoundError, Exception) as e:
                     last_error = e
-                    error_msg = str(e).lower()
                     
                     # Clean up any partially created driver
                     if driver:
                         try:
                             driver.quit()
-                        except:
+                        except Exception:
                             pass
                         driver = None
+                    if profile_dir:
+                        self._release_profile_dir(profile_dir)
                     
                     # Check for specific errors that might be recoverable
-                    is_recoverable = any(keyword in error_msg for keyword in [
-                        'no such file', 'chromedriver', 'can not connect', 
-                        'cannot connect', 'session not created', 'connection refused',
-                        'service', 'chromeoptions', 'reuse', '127.0.0.1',
-                        'chrome not reachable', 'not reachable', 'unable to connect'
-                    ])
-                    
-                    if is_recoverable and attempt < max_retries - 1:
+                    if _is_recoverable_launch_error(e) and attempt < max_retries - 1:
                         # Longer wait time for "chrome not reachable" errors
                         base_wait = (attempt + 1) * 3  # Increased from 2 to 3 seconds
-                        if 'not reachable' in error_msg or 'cannot connect' in error_msg:
+                        if _SLOW_START_RE.search(str(e)):
                             base_wait += 2  # Extra wait for connection issues
                         wait_time = base_wait + random.uniform(0.5, 1.5)  # Exponential backoff with jitter
                         print(f"  Driver creation failed (attempt {attempt + 1}/{max_retries}): {str(e)[:100]}...")
@@ -202,8 +1094,112 @@ class TikTokVideoMetadataExtractor:
         
         # Should not reach here, but just in case
         raise last_error if last_error else WebDriverException("Failed to create driver after retries")
+
+
+def create_browser_pool(headless: bool = False, num_threads: int = 3, pin_cpus: bool = False,
+                        refill: bool = False, factory: Optional[Callable] = None) -> BrowserPool:
+    """
+    Pool of warm extractor Chromes for callers that share them across tasks.
+    
+    Drivers go back with cookies and storage cleared, so tasks don't see each
+    other's state.
+    
+    Args:
+        headless, num_threads, pin_cpus: Settings for a new ChromeLauncher;
+            num_threads is also the pool size
+        refill: Relaunch discarded drivers in the background (see BrowserPool)
+        factory: Driver factory to use instead of a new ChromeLauncher (e.g. an
+            extractor's _create_driver, so replacements share its profile dirs)
+    """
+    if factory is None:
+        factory = ChromeLauncher(headless, num_threads, pin_cpus)
+    return BrowserPool(factory, maxsize=max(1, num_threads), reset=_reset_driver_state, refill=refill)
+
+
+class TikTokVideoMetadataExtractor:
+    """Extracts metadata from TikTok video pages."""
+    
+    def __init__(self, headless: bool = False, delay: float = 2.0, num_threads: int = 3, pool=None,
+                 http_first: bool = True, pin_cpus: bool = False):
+        """
+        Initialize the extractor.
+        
+        Args:
+            headless: Run browser in headless mode
+            delay: Delay between requests in seconds
+            num_threads: Number of parallel threads for processing (default: 3, reduced to prevent Chrome conflicts)
+            pool: Optional BrowserPool that threaded extraction checks drivers out of;
+                one is created for the run when not given
+            http_first: Try a plain HTTP fetch of each video page before opening it in Chrome
+            pin_cpus: Give each pooled Chrome its own share of the CPUs (Linux only)
+        """
+        self.headless = headless
+        self.delay = delay
+        self.num_threads = num_threads
+        self.pool = pool
+        self.http_first = http_first
+        self.pin_cpus = pin_cpus
+        self.driver = None
+        self._file_save_lock = _FastLock()  # Separate lock for file operations
+        self._launcher = ChromeLauncher(headless, num_threads, pin_cpus)
+        # Every request goes to tiktok.com, so space page loads across all threads
+        # (delay / num_threads apart) instead of letting them hit the host together
+        self._min_request_interval = delay / max(1, num_threads)
+        self._next_request_at = 0.0
+        self._request_pace_lock = _FastLock()
+        # next() on an itertools.count is atomic under the GIL, so workers can
+        # number their progress lines without taking a lock
+        self._progress_counter = itertools.count(1)
+        self._completed_count = 0  # Only updated by the writer thread
+
+    def setup_driver(self):
+        """Setup undetected ChromeDriver using webdriver_manager."""
+        if not SELENIUM_AVAILABLE:
+            raise ImportError("Please install required packages: pip install undetected-chromedriver selenium webdriver-manager")
+        
+        options = _uc().ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        # driver.get returns at DOMContentLoaded; _JS_PAGE_READY covers the data
+        options.page_load_strategy = 'eager'
+
+        print("Launching Chrome browser...")
+        # undetected_chromedriver patches the driver resolved by webdriver_manager
+        self.driver = _uc().Chrome(options=options, driver_executable_path=_get_chromedriver_path())
+        _track_driver_processes(self.driver)
+        self.driver.set_page_load_timeout(60)
+        _block_heavy_resources(self.driver)
+        _install_extraction_script(self.driver)
     
-    def extract_metadata(self, video_url: str, driver=None, max_retries: int = 2) -> Dict:
+    _is_driver_alive = staticmethod(_is_driver_alive)
+    
+    def _create_driver(self, max_retries: int = 3):
+        """Launch a new pooled-style driver (see ChromeLauncher)."""
+        return self._launcher(max_retries)
+    
+    @staticmethod
+    def _quit_replacement_driver(driver, caller_driver):
+        """Quit a driver extract_metadata launched in place of the caller's dead one."""
+        if caller_driver is None or driver is None or driver is caller_driver:
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def _pace_request(self):
+        """Wait for this thread's slot in the shared tiktok.com request schedule."""
+        with self._request_pace_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request_at)
+            self._next_request_at = slot + self._min_request_interval
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def extract_metadata(self, video_url: str, driver=None, max_retries: int = 2, try_http: bool = True) -> Dict:
         """
         Extract metadata from a TikTok video page.
         
@@ -211,11 +1207,25 @@ class TikTokVideoMetadataExtractor:
             video_url: URL of the TikTok video
             driver: Optional Selenium driver instance (if None, uses self.driver)
             max_retries: Maximum number of retries for driver errors (default: 2)
+            try_http: Try the browserless fetch first when http_first is set
+                (False when extract_from_links_http already tried this URL)
             
         Returns:
             Dictionary containing video metadata
         """
+        # Most pages serve the rehydration JSON to a plain GET; only open the page
+        # in Chrome when that fails (bot challenge, missing data)
+        if self.http_first and try_http:
+            metadata = self._extract_via_http(video_url)
+            if metadata is not None:
+                if driver is None:
+                    time.sleep(self.delay)  # Delay between requests (sequential mode)
+                return metadata
+        
         use_local_driver = driver is not None
+        # The caller (a pool worker) owns its driver; any replacement launched
+        # below after it dies is ours to quit before returning
+        caller_driver = driver
         if not driver:
             if not self.driver or not self._is_driver_alive(self.driver):
                 self.setup_driver()
@@ -260,6 +1270,8 @@ class TikTokVideoMetadataExtractor:
         }
         
         hashtags_found = set()
+        # Whole-page text is only scanned for hashtags if title/description had none
+        page_text = None
         
         def _add_hashtags_from_text(text: Optional[str]):
             for tag in self._extract_hashtags_from_text(text):
@@ -274,6 +1286,7 @@ class TikTokVideoMetadataExtractor:
                     if use_local_driver:
                         # Recreate driver for thread-local case
                         try:
+                            self._quit_replacement_driver(driver, caller_driver)
                             driver = self._create_driver()
                         except Exception as e:
                             last_error = f"Driver recreation failed: {str(e)}"
@@ -289,39 +1302,33 @@ class TikTokVideoMetadataExtractor:
                 # Print only in sequential mode (when using shared driver)
                 is_sequential = (driver is None or driver == self.driver)
                 if is_sequential and retry_attempt == 0:
-                    print(f"\nExtracting metadata from: {video_url}")
+                    _log(f"\nExtracting metadata from: {video_url}")
                 
                 
+                self._pace_request()
                 driver.get(video_url)
-                # Reduced wait time - page should load faster
-                time.sleep(max(self.delay, 1.5))  # Minimum 1.5s, or use configured delay
-                
-                # Check driver is still alive after page load
-                if not self._is_driver_alive(driver):
-                    raise WebDriverException("Driver died after page load")
+                # Wait only until the video data is on the page instead of a fixed sleep
+                try:
+                    WebDriverWait(driver, 8).until(lambda d: d.execute_script(_JS_PAGE_READY))
+                except TimeoutException:
+                    pass  # Extract whatever did load; the fallbacks below handle gaps
                 
                 # If we get here, the operation succeeded, continue with extraction
                 # All extraction code is below, wrapped in try-except
                 
             except (InvalidSessionIdException, WebDriverException) as e:
-                error_msg = str(e).lower()
                 last_error = str(e)
                 
                 # Check for specific recoverable errors
-                is_recoverable = any(keyword in error_msg for keyword in [
-                    'target window already closed',
-                    'no such window',
-                    'web view not found',
-                    'session',
-                    'connection',
-                    'service'
-                ])
-                
-                if is_recoverable and retry_attempt < max_retries - 1:
-                    print(f"  Driver error (attempt {retry_attempt + 1}/{max_retries}), retrying...")
+                if _is_recoverable_session_error(e) and retry_attempt < max_retries - 1:
+                    _log(f"  Driver error (attempt {retry_attempt + 1}/{max_retries}), retrying...")
+                    # Only the tab died: open a new one in the same browser
+                    if _TAB_LOST_RE.search(str(e)) and _reopen_tab(driver):
+                        continue
                     # Recreate driver
                     try:
                         if use_local_driver:
+                            self._quit_replacement_driver(driver, caller_driver)
                             driver = self._create_driver()
                         else:
                             self.setup_driver()
@@ -354,6 +1361,7 @@ class TikTokVideoMetadataExtractor:
                 'hashtags': [],
                 'error': last_error
             }
+            self._quit_replacement_driver(driver, caller_driver)
             # Only delay if using shared driver (sequential mode)
             if not use_local_driver:
                 time.sleep(self.delay)
@@ -361,45 +1369,11 @@ class TikTokVideoMetadataExtractor:
         
         # If we get here, driver.get() succeeded, continue with extraction
         try:
-            # Check driver is still alive before JavaScript execution
-            if not self._is_driver_alive(driver):
-                raise WebDriverException("Driver died during page load")
-            
             # Execute JavaScript to extract data from TikTok's internal state
             try:
-                # Check driver before executing script
-                if not self._is_driver_alive(driver):
-                    raise WebDriverException("Driver died before JavaScript execution")
-                js_data = driver.execute_script("""
-                    // Try to access TikTok's data structures
-                    let result = {};
-                    
-                    // Try __UNIVERSAL_DATA_FOR_REHYDRATION__
-                    if (window.__UNIVERSAL_DATA_FOR_REHYDRATION__) {
-                        result.universal_data = window.__UNIVERSAL_DATA_FOR_REHYDRATION__;
-                    }
-                    
-                    // Try to get video metadata from page
-                    if (window.SIGI_STATE) {
-                        result.sigi_state = window.SIGI_STATE;
-                    }
-                    
-                    // Try to get from meta tags
-                    let metaTags = {};
-                    document.querySelectorAll('meta').forEach(meta => {
-                        let prop = meta.getAttribute('property') || meta.getAttribute('name');
-                        let content = meta.getAttribute('content');
-                        if (prop && content) {
-                            metaTags[prop] = content;
-                        }
-                    });
-                    result.metaTags = metaTags;
-                    
-                    // Get page text for regex extraction
-                    result.pageText = document.body.innerText;
-                    
-                    return result;
-                """)
+                # Rehydration JSON was already parsed in-page during load by the
+                # script registered in _install_extraction_script
+                js_data = driver.execute_async_script(_JS_READ_EXTRACTION) or {}
                 
                 # Process JavaScript extracted data
                 if js_data.get('metaTags'):
@@ -413,142 +1387,96 @@ class TikTokVideoMetadataExtractor:
                         metadata['description'] = desc_val
                     _add_hashtags_from_text(desc_val)
                 page_text = js_data.get('pageText')
-                if page_text:
-                    _add_hashtags_from_text(page_text)
                 
                 # Try to extract from universal data
                 if js_data.get('universal_data'):
-                    # Search for video stats in the data structure
-                    data_str = json.dumps(js_data['universal_data'])
-                    print(data_str)
-                    # Extract numbers from JSON
-                    like_matches = re.findall(r'"diggCount":\s*(\d+)', data_str)
-                    if like_matches:
-                        metadata['like_count'] = int(min(like_matches, key=lambda x: int(x)))
-                    
-                    comment_matches = re.findall(r'"commentCount":\s*(\d+)', data_str)
-                    if comment_matches:
-                        metadata['comment_count'] = int(max(comment_matches, key=lambda x: int(x)))
-                    
-                    share_matches = re.findall(r'"shareCount":\s*(\d+)', data_str)
-                    if share_matches:
-                        metadata['share_count'] = int(max(share_matches, key=lambda x: int(x)))
+                    # Walk the rehydration dict directly and bucket every stats field
+                    numbers, strings = _collect_fields(js_data['universal_data'])
                     
-                    view_matches = re.findall(r'"playCount":\s*(\d+)', data_str)
-                    if view_matches:
-                        metadata['view_count'] = int(max(view_matches, key=lambda x: int(x)))
+                    if numbers['diggCount']:
+                        metadata['like_count'] = min(numbers['diggCount'])
+                    if numbers['commentCount']:
+                        metadata['comment_count'] = max(numbers['commentCount'])
+                    if numbers['shareCount']:
+                        metadata['share_count'] = max(numbers['shareCount'])
+                    if numbers['playCount']:
+                        metadata['view_count'] = max(numbers['playCount'])
                     
-                    # Extract archive count (collectCount) - try multiple field names
-                    collect_patterns = [
-                        r'"collectCount":\s*(\d+)',
-                        r'"collectionCount":\s*(\d+)',
-                        r'"savedCount":\s*(\d+)',
-                        r'"bookmarkCount":\s*(\d+)',
-                        r'"favoriteCount":\s*(\d+)',
-                        r'"collect":\s*(\d+)',
-                    ]
-                    collect_matches = []
-                    for pattern in collect_patterns:
-                        matches = re.findall(pattern, data_str)
-                        if matches:
-                            collect_matches.extend(matches)
+                    # Archive count (collectCount) - try multiple field names
+                    collect_matches = [n for field in _COLLECT_FIELDS for n in numbers[field]]
                     if collect_matches:
-                        metadata['archive_count'] = int(max(collect_matches, key=lambda x: int(x)))
+                        metadata['archive_count'] = max(collect_matches)
                     
                     # Extract username
-                    username_matches = re.findall(r'"uniqueId":\s*"([^"]+)"', data_str)
-                    if username_matches:
-                        metadata['username'] = username_matches[0]
+                    if strings['uniqueId']:
+                        metadata['username'] = strings['uniqueId'][0]
                     
                     # Extract description
-                    desc_matches = re.findall(r'"text":\s*"([^"]+)"', data_str)
+                    desc_matches = strings['text']
                     if desc_matches and not metadata['description']:
                         # Get the longest description (likely the video description)
                         metadata['description'] = max(desc_matches, key=len)
                         metadata['title'] = metadata['description'][:100]
                         _add_hashtags_from_text(metadata['description'])
+                
+                # Pages that ship SIGI_STATE instead key the video by ID: read it directly
+                sigi_item = _sigi_item(js_data.get('sigi_state'), video_url)
+                if sigi_item:
+                    stats = sigi_item.get('stats') if isinstance(sigi_item.get('stats'), dict) else {}
+                    for field, key in _SIGI_STAT_KEYS:
+                        if not metadata[field]:
+                            metadata[field] = _to_int(stats.get(key))
+                    author = sigi_item.get('author')
+                    if not metadata['username'] and isinstance(author, str) and author:
+                        metadata['username'] = author
+                    desc = sigi_item.get('desc')
+                    if not metadata['description'] and isinstance(desc, str) and desc:
+                        metadata['description'] = desc
+                        metadata['title'] = desc[:100]
+                        _add_hashtags_from_text(desc)
                         
             except Exception as e:
-                print(f"  Warning: JavaScript extraction failed: {e}")
+                _log(f"  Warning: JavaScript extraction failed: {e}")
+            
+            # Username and description candidates from the DOM in one round-trip,
+            # checked in the same priority order as the old per-selector lookups
+            try:
+                candidates = driver.execute_script(_JS_PAGE_CANDIDATES) or {}
+            except Exception as e:
+                _log(f"  Warning: Could not read page elements: {e}")
+                candidates = {}
             
             # Extract username from URL or page
             try:
                 # Try to get username from URL first
-                username_match = re.search(r'@([^/]+)', video_url)
+                username_match = _URL_USERNAME_RE.search(video_url)
                 if username_match:
                     metadata['username'] = username_match.group(1)
                 
                 # Also try to extract from page
                 if not metadata['username']:
-                    # Try multiple methods to find username
-                    username_selectors = [
-                        "//a[contains(@href, '/@')]",
-                        "//*[contains(@data-e2e, 'browse-username')]",
-                        "//*[contains(@class, 'username')]",
-                        "//h2[contains(@data-e2e, 'browse-username')]",
-                    ]
-                    
-                    for selector in username_selectors:
-                        try:
-                            if not self._is_driver_alive(driver):
-                                break
-                            username_elements = driver.find_elements(By.XPATH, selector)
-                            for elem in username_elements[:5]:
-                                try:
-                                    href = elem.get_attribute('href')
-                                    if href and '/@' in href:
-                                        match = re.search(r'@([^/]+)', href)
-                                        if match:
-                                            metadata['username'] = match.group(1)
-                                            break
-                                    
-                                    # Also check text content
-                                    text = elem.text.strip()
-                                    if text.startswith('@'):
-                                        metadata['username'] = text.replace('@', '').strip()
-                                        break
-                                except:
-                                    continue
-                            if metadata['username']:
-                                break
-                        except:
-                            continue
+                    user_href = candidates.get('userHref')
+                    user_text = candidates.get('userText')
+                    match = _URL_USERNAME_RE.search(user_href) if user_href else None
+                    if match:
+                        metadata['username'] = match.group(1)
+                    elif user_text:
+                        metadata['username'] = user_text.replace('@', '').strip()
             except Exception as e:
-                print(f"  Warning: Could not extract username: {e}")
+                _log(f"  Warning: Could not extract username: {e}")
+            
+            # Full HTML is a multi-MB transfer; fetched at most once, and only if needed
+            page_source = None
             
             # Extract description/title
             try:
-                # Try multiple selectors for description
-                description_selectors = [
-                    "//*[@data-e2e='browse-video-desc']",
-                    "//*[contains(@class, 'video-desc')]",
-                    "//*[contains(@class, 'description')]",
-                    "//h1",
-                    "//h2",
-                    "//meta[@property='og:description']",
-                    "//meta[@name='description']",
-                ]
-                
-                for selector in description_selectors:
-                    try:
-                        if not self._is_driver_alive(driver):
-                            break
-                        if selector.startswith("//meta"):
-                            elem = driver.find_element(By.XPATH, selector)
-                            description = elem.get_attribute('content')
-                        else:
-                            elem = driver.find_element(By.XPATH, selector)
-                            description = elem.text.strip()
-                        
-                        if description and len(description) > 0:
-                            # Use first line as title, full text as description
-                            lines = description.split('\n')
-                            metadata['title'] = lines[0].strip() if lines else description[:100]
-                            metadata['description'] = description.strip()
-                            _add_hashtags_from_text(metadata['description'])
-                            break
-                    except:
-                        continue
+                description = candidates.get('description')
+                if description:
+                    # Use first line as title, full text as description
+                    lines = description.split('\n')
+                    metadata['title'] = lines[0].strip() if lines else description[:100]
+                    metadata['description'] = description.strip()
+                    _add_hashtags_from_text(metadata['description'])
                 
                 # Fallback: Get from page source
                 if not metadata['description']:
@@ -556,306 +1484,165 @@ class TikTokVideoMetadataExtractor:
                         raise WebDriverException("Driver died before getting page source")
                     page_source = driver.page_source
                     # Try to find in JSON-LD or meta tags
-                    meta_desc = re.search(r'<meta[^>]*property=["\']og:description["\'][^>]*content=["\']([^"\']+)["\']', page_source)
+                    meta_desc = _META_OG_DESC_RE.search(page_source)
                     if meta_desc:
                         metadata['description'] = meta_desc.group(1)
                         metadata['title'] = metadata['description'][:100]
                         _add_hashtags_from_text(metadata['description'])
             except Exception as e:
-                print(f"  Warning: Could not extract description: {e}")
+                _log(f"  Warning: Could not extract description: {e}")
             
             # Extract engagement metrics (like, comment, share, view counts)
             try:
-                if not self._is_driver_alive(driver):
-                    raise WebDriverException("Driver died before extracting metrics")
-                page_source = driver.page_source
+                # Skip the page_source re-scrape when the JS pass already filled every metric
+                if not all(metadata[k] for k in _METRIC_FIELDS):
+                    if not self._is_driver_alive(driver):
+                        raise WebDriverException("Driver died before extracting metrics")
+                    if page_source is None:
+                        page_source = driver.page_source
                 
-                # Try to extract from structured data in page source
-                # Look for JSON data with metrics - TikTok stores data in __UNIVERSAL_DATA_FOR_REHYDRATION__
-                try:
-                    # Try to extract from JavaScript JSON data
-                    json_data_match = re.search(r'<script[^>]*id=["\']__UNIVERSAL_DATA_FOR_REHYDRATION__["\'][^>]*>(.*?)</script>', page_source, re.DOTALL)
-                    if json_data_match:
-                        json_str = json_data_match.group(1)
-                        try:
-                            data = json.loads(json_str)
-                            
-                            # Navigate through the data structure to find video stats
-                            def find_in_dict(obj, key):
-                                if isinstance(obj, dict):
-                                    if key in obj:
-                                        return obj[key]
-                                    for v in obj.values():
-                                        result = find_in_dict(v, key)
-                                        if result is not None:
-                                            return result
-                                elif isinstance(obj, list):
-                                    for item in obj:
-                                        result = find_in_dict(item, key)
-                                        if result is not None:
-                                            return result
-                                return None
-                            
-                            # Try to find video data
-                            video_data = find_in_dict(data, 'videoData') or find_in_dict(data, 'itemInfo') or find_in_dict(data, 'stats')
-                            
-                            if video_data and isinstance(video_data, dict):
-                                metadata['like_count'] = video_data.get('diggCount') or video_data.get('likeCount')
-                                metadata['comment_count'] = video_data.get('commentCount')
-                                metadata['share_count'] = video_data.get('shareCount')
-                                metadata['view_count'] = video_data.get('playCount') or video_data.get('viewCount')
-                                # Try multiple field names for archive count
-                                metadata['archive_count'] = (
-                                    video_data.get('collectCount') or
-                                    video_data.get('collectionCount') or
-                                    video_data.get('savedCount') or
-                                    video_data.get('bookmarkCount') or
-                                    video_data.get('favoriteCount')
-                                )
-                            
-                            # Also try to find collectCount in stats object if it exists separately
-                            if not metadata['archive_count']:
-                                stats_data = find_in_dict(data, 'stats')
-                                if stats_data and isinstance(stats_data, dict):
-                                    metadata['archive_count'] = (
-                                        stats_data.get('collectCount') or
-                                        stats_data.get('collectionCount') or
-                                        stats_data.get('savedCount') or
-                                        stats_data.get('bookmarkCount') or
-                                        stats_data.get('favoriteCount')
-                                    )
-                            
-                            # Also try to find collectCount in the entire data structure recursively
+                    # Try to extract from structured data in page source
+                    # Look for JSON data with metrics - TikTok stores data in __UNIVERSAL_DATA_FOR_REHYDRATION__
+                    json_data_match = _REHYDRATION_SCRIPT_RE.search(page_source)
+                    data = _loads_or_none(json_data_match.group(1)) if json_data_match else None
+                    if data is not None:
+                        # The video's stats sit at a known path; only search the
+                        # whole tree when the page is laid out differently
+                        item = _rehydration_item(data)
+                        stats_data = item.get('stats') if item else None
+                        if not isinstance(stats_data, dict):
+                            stats_data = _find_in_dict(data, 'stats')
+                    
+                        if isinstance(stats_data, dict):
+                            if not metadata['like_count']:
+                                metadata['like_count'] = stats_data.get('diggCount') or stats_data.get('likeCount')
+                            if not metadata['comment_count']:
+                                metadata['comment_count'] = stats_data.get('commentCount')
+                            if not metadata['share_count']:
+                                metadata['share_count'] = stats_data.get('shareCount')
+                            if not metadata['view_count']:
+                                metadata['view_count'] = stats_data.get('playCount') or stats_data.get('viewCount')
                             if not metadata['archive_count']:
-                                collect_field_names = ['collectCount', 'collectionCount', 'savedCount', 'bookmarkCount', 'favoriteCount']
-                                for field_name in collect_field_names:
-                                    collect_value = find_in_dict(data, field_name)
-                                    if collect_value is not None:
-                                        try:
-                                            metadata['archive_count'] = int(collect_value)
-                                            break
-                                        except (ValueError, TypeError):
-                                            continue
-                        except:
-                            pass
-                except:
-                    pass
-                
-                # Fallback: Extract from regex patterns in page source
-                if not metadata['like_count']:
-                    like_matches = re.findall(r'"diggCount":\s*(\d+)', page_source) + \
-                                  re.findall(r'"likeCount":\s*(\d+)', page_source)
-                    if like_matches:
-                        metadata['like_count'] = int(min(like_matches, key=lambda x: int(x)))
-                
-                if not metadata['comment_count']:
-                    comment_matches = re.findall(r'"commentCount":\s*(\d+)', page_source)
-                    if comment_matches:
-                        metadata['comment_count'] = int(max(comment_matches, key=lambda x: int(x)))
-                
-                if not metadata['share_count']:
-                    share_matches = re.findall(r'"shareCount":\s*(\d+)', page_source)
-                    if share_matches:
-                        metadata['share_count'] = int(max(share_matches, key=lambda x: int(x)))
-                
-                if not metadata['view_count']:
-                    view_matches = re.findall(r'"playCount":\s*(\d+)', page_source) + \
-                                  re.findall(r'"viewCount":\s*(\d+)', page_source)
-                    if view_matches:
-                        metadata['view_count'] = int(max(view_matches, key=lambda x: int(x)))
-                
-                # Extract archive count (collectCount) from page source - try multiple field names
-                # Also try case-insensitive and with/without quotes variations
-                if not metadata['archive_count']:
-                    collect_patterns = [
-                        r'"collectCount":\s*(\d+)',
-                        r'"collectionCount":\s*(\d+)',
-                        r'"savedCount":\s*(\d+)',
-                        r'"bookmarkCount":\s*(\d+)',
-                        r'"favoriteCount":\s*(\d+)',
-                        r'"collect":\s*(\d+)',
-                        r'collectCount["\']?\s*:\s*(\d+)',  # Without quotes
-                        r'collectionCount["\']?\s*:\s*(\d+)',
-                        r'savedCount["\']?\s*:\s*(\d+)',
-                        r'bookmarkCount["\']?\s*:\s*(\d+)',
-                        r'favoriteCount["\']?\s*:\s*(\d+)',
-                    ]
-                    collect_matches = []
-                    for pattern in collect_patterns:
-                        matches = re.findall(pattern, page_source, re.IGNORECASE)
-                        if matches:
-                            collect_matches.extend(matches)
-                    if collect_matches:
-                        metadata['archive_count'] = int(max(collect_matches, key=lambda x: int(x)))
-                
-                # Also try to extract from visible elements
-                if not metadata['like_count']:
-                    try:
-                        like_elements = driver.find_elements(By.XPATH, "//*[contains(@data-e2e, 'like') or contains(text(), 'Like')]")
-                        for elem in like_elements[:5]:
-                            try:
-                                text = elem.text.strip()
-                                # Look for numbers near "Like"
-                                numbers = re.findall(r'(\d+(?:\.\d+)?[KMB]?)', text)
-                                if numbers:
-                                    metadata['like_count'] = self.parse_count(numbers[0])
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
-                
-                if not metadata['comment_count']:
-                    try:
-                        comment_elements = driver.find_elements(By.XPATH, "//*[contains(@data-e2e, 'comment') or contains(text(), 'Comment')]")
-                        for elem in comment_elements[:5]:
-                            try:
-                                text = elem.text.strip()
-                                numbers = re.findall(r'(\d+(?:\.\d+)?[KMB]?)', text)
-                                if numbers:
-                                    metadata['comment_count'] = self.parse_count(numbers[0])
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
-                
-                if not metadata['share_count']:
-                    try:
-                        share_elements = driver.find_elements(By.XPATH, "//*[contains(@data-e2e, 'share') or contains(text(), 'Share')]")
-                        for elem in share_elements[:5]:
-                            try:
-                                text = elem.text.strip()
-                                numbers = re.findall(r'(\d+(?:\.\d+)?[KMB]?)', text)
-                                if numbers:
-                                    metadata['share_count'] = self.parse_count(numbers[0])
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
+                                metadata['archive_count'] = _archive_stat(stats_data)
+                    
+                        # Also try to find an archive count anywhere in the data, in one traversal
+                        if metadata['archive_count'] is None:
+                            collect_value = _find_in_dict(data, _ARCHIVE_STAT_KEYS)
+                            if collect_value is not None:
+                                try:
+                                    metadata['archive_count'] = int(collect_value)
+                                except (ValueError, TypeError):
+                                    pass
                 
-                if not metadata['view_count']:
-                    try:
-                        view_elements = driver.find_elements(By.XPATH, "//*[contains(@data-e2e, 'view') or contains(text(), 'View')]")
-                        for elem in view_elements[:5]:
-                            try:
-                                text = elem.text.strip()
-                                numbers = re.findall(r'(\d+(?:\.\d+)?[KMB]?)', text)
-                                if numbers:
-                                    metadata['view_count'] = self.parse_count(numbers[0])
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
+                    # Fallback: bucket every count field in page source in a single scan,
+                    # unless the structured data above already filled every metric. The
+                    # substring probe skips the scan when no missing stat's key is in the
+                    # page (archive names match case-insensitively, so they can't be probed)
+                    missing_counts = [field for field in _METRIC_FIELDS if not metadata[field]]
+                    if 'archive_count' in missing_counts or any(
+                            key in page_source for field in missing_counts for key in _PAGE_COUNT_KEYS[field]):
+                        # Running min/max per field as we go, no match lists. Smallest
+                        # like count is the video's own; the rest take the largest
+                        best = {}
+                        for m in _PAGE_COUNTS_RE.finditer(page_source):
+                            if m.group(1):
+                                field, value = _PAGE_COUNT_FIELDS[m.group(1)], int(m.group(2))
+                            else:
+                                field, value = 'archive_count', int(m.group(3))
+                            current = best.get(field)
+                            if current is None or (value < current if field == 'like_count' else value > current):
+                                best[field] = value
+                        
+                        for field, value in best.items():
+                            if not metadata[field]:
+                                metadata[field] = value
                 
-                # Extract archive count from visible elements
-                if not metadata['archive_count']:
+                # Also try to extract from visible elements: the candidate texts for every
+                # still-missing metric come back from one in-page script
+                missing = {field: _VISIBLE_COUNT_SELECTORS[field] for field in _METRIC_FIELDS if not metadata[field]}
+                if missing:
                     try:
-                        # Try multiple selectors for collect/archive/save buttons
-                        collect_selectors = [
-                            "//*[contains(@data-e2e, 'collect')]",
-                            "//*[contains(@data-e2e, 'archive')]",
-                            "//*[contains(@data-e2e, 'save')]",
-                            "//*[contains(@data-e2e, 'bookmark')]",
-                            "//*[contains(@aria-label, 'collect') or contains(@aria-label, 'save')]",
-                            "//button[contains(., 'Collect') or contains(., 'Save')]",
-                            "//*[contains(@class, 'collect') or contains(@class, 'save')]",
-                        ]
-                        for selector in collect_selectors:
-                            try:
-                                collect_elements = driver.find_elements(By.XPATH, selector)
-                                for elem in collect_elements[:5]:
-                                    try:
-                                        # Get text from element and nearby elements
-                                        text = elem.text.strip()
-                                        # Also check parent element
-                                        try:
-                                            parent = elem.find_element(By.XPATH, "..")
-                                            text += " " + parent.text.strip()
-                                        except:
-                                            pass
-                                        # Look for numbers
-                                        numbers = re.findall(r'(\d+(?:\.\d+)?[KMB]?)', text)
-                                        if numbers:
-                                            metadata['archive_count'] = self.parse_count(numbers[0])
-                                            break
-                                    except:
-                                        continue
-                                if metadata['archive_count']:
-                                    break
-                            except:
-                                continue
-                    except:
-                        pass
+                        visible_texts = driver.execute_script(_JS_VISIBLE_COUNT_TEXTS, missing) or {}
+                    except Exception:
+                        visible_texts = {}
+                    for field, texts in visible_texts.items():
+                        for text in texts:
+                            # Look for numbers near the label
+                            numbers = _COUNT_TEXT_RE.findall(text)
+                            if numbers:
+                                metadata[field] = self.parse_count(numbers[0])
+                                break
                         
             except Exception as e:
-                print(f"  Warning: Could not extract metrics: {e}")
+                _log(f"  Warning: Could not extract metrics: {e}")
             
-            print(f"  ✓ Extracted: @{metadata['username']}, {metadata['like_count']} likes, {metadata['view_count']} views")
+            _log(f"  ✓ Extracted: @{metadata['username']}, {metadata['like_count']} likes, {metadata['view_count']} views")
             
         except Exception as e:
             error_msg = str(e)
             metadata['error'] = error_msg
-            print(f"  ✗ Error extracting metadata: {error_msg}")
-        
-        # Only delay if using shared driver (sequential mode)
-            time.sleep(self.delay)  # Delay between requests
+            _log(f"  ✗ Error extracting metadata: {error_msg}")
         
         if metadata.get('description'):
             _add_hashtags_from_text(metadata['description'])
+        if not hashtags_found:
+            _add_hashtags_from_text(page_text)
         metadata['hashtags'] = sorted(hashtags_found)
         if metadata['archive_count'] is not None:
             try:
                 metadata['archive_count'] = int(metadata['archive_count'])
             except (ValueError, TypeError):
                 metadata['archive_count'] = None
-        time.sleep(self.delay)  # Delay between requests
+        self._quit_replacement_driver(driver, caller_driver)
+        # Only delay if using shared driver (sequential mode); pooled workers are
+        # already spaced by _pace_request
+        if not use_local_driver:
+            time.sleep(self.delay)  # Delay between requests
         return metadata
     
-    def _process_single_video(self, video_url: str, index: int, total: int) -> Dict:
+    def _process_single_video(self, video_url: str, index: int, total: int, driver=None,
+                              try_http: bool = True) -> Dict:
         """
         Process a single video in a thread-safe manner.
-        Creates its own browser instance for thread safety.
+        Uses the caller's driver, or checks one out of self.pool for thread safety.
         
         Args:
             video_url: URL of the video to process
             index: Index of the video (for progress tracking)
             total: Total number of videos
+            driver: Optional driver owned by the calling worker thread
+            try_http: Passed through to extract_metadata
             
         Returns:
             Dictionary containing video metadata
         """
-        driver = None
         try:
-            # Create a new driver instance for this thread (with retry logic)
-            driver = self._create_driver()
-            
-            # Extract metadata using thread-local driver (with retry logic)
-            metadata = self.extract_metadata(video_url, driver=driver, max_retries=2)
+            if driver is not None:
+                metadata = self.extract_metadata(video_url, driver=driver, max_retries=2, try_http=try_http)
+            else:
+                # Browserless first, so a page that carries its data in the HTML
+                # never launches or holds a pooled Chrome
+                metadata = self._extract_via_http(video_url) if self.http_first and try_http else None
+                if metadata is None:
+                    # Check a warm driver out of the pool for this video; it goes back
+                    # (with cookies/storage cleared) instead of being quit afterwards
+                    with self.pool.checkout() as driver:
+                        # Extract metadata using thread-local driver (with retry logic)
+                        metadata = self.extract_metadata(video_url, driver=driver, max_retries=2, try_http=False)
             
             # Update progress in a thread-safe manner
-            with self._progress_lock:
-                self._processed_count += 1
-                current = self._processed_count
+            current = next(self._progress_counter)
             
-            # Print outside lock to avoid blocking
-            username = metadata.get('username', 'N/A')
-            likes = metadata.get('like_count', 'N/A')
-            views = metadata.get('view_count', 'N/A')
-            print(f"[{current}/{total}] ✓ @{username} - {likes} likes, {views} views")
+            username, likes, views = _PROGRESS_FIELDS(metadata)
+            _log(f"[{current}/{total}] ✓ @{username} - {likes} likes, {views} views")
             
             return metadata
             
         except Exception as e:
             error_msg = str(e)
-            with self._progress_lock:
-                self._processed_count += 1
-                current = self._processed_count
+            current = next(self._progress_counter)
             
-            # Print outside lock to avoid blocking
-            print(f"[{current}/{total}] ✗ Error: {video_url} - {error_msg}")
+            _log(f"[{current}/{total}] ✗ Error: {video_url} - {error_msg}")
             
             return {
                 'url': video_url,
@@ -870,46 +1657,220 @@ class TikTokVideoMetadataExtractor:
                 'hashtags': [],
                 'error': error_msg
             }
-        finally:
-            # Always close the driver to free resources
-            if driver:
-                try:
-                    # Try graceful shutdown first
-                    driver.quit()
-                except:
+    
+    def _extraction_worker(self, thread_id: int, url_queue: queue.SimpleQueue, results_queue: queue.SimpleQueue, total: int,
+                           try_http: bool = True):
+        """
+        Worker thread: keep one pooled driver and process URLs until a stop signal.
+        
+        Args:
+            thread_id: Identifier for this worker (for log output)
+            url_queue: Queue of (index, url) items, ended by None
+            results_queue: Queue receiving (index, metadata) items
+            total: Total number of videos (for progress output)
+            try_http: Passed through to extract_metadata
+        """
+        driver = None
+        try:
+            while True:
+                item = url_queue.get()
+                if item is None:
+                    break
+                index, video_url = item
+                # Swap out a driver that died on the previous video
+                if driver is not None and not self._is_driver_alive(driver):
+                    self.pool.release(driver, discard=True)
+                    driver = None
+                if driver is None:
+                    try:
+                        driver = self.pool.acquire()
+                    except Exception as e:
+                        _log(f"  ✗ Thread {thread_id}: Could not get a browser: {e}")
+                results_queue.put((index, self._process_single_video(video_url, index, total, driver=driver,
+                                                                     try_http=try_http)))
+                if driver is not None:
+                    # Start the next video with clean cookies/storage (cache stays warm)
                     try:
-                        # Force close if quit() fails
-                        driver.close()
-                    except:
+                        _reset_driver_state(driver)
+                    except Exception:
                         pass
-                # Small delay to allow cleanup
-                time.sleep(0.1)
+        finally:
+            if driver is not None:
+                self.pool.release(driver)
+    
+    def _collect_results(self, results_queue: queue.SimpleQueue, all_metadata: List, output_file: Optional[str]):
+        """
+        Writer thread: place (index, metadata) results and checkpoint them in batches.
+        
+        Runs until it receives None, so file I/O never blocks the extraction workers.
+        """
+        pending = []
+        completed = 0
+        batch_started = 0.0
+        stopped = False
+        while not stopped:
+            # Block indefinitely when idle; otherwise wake up in time for the next flush
+            timeout = max(0.0, batch_started + _PARTIAL_FLUSH_SECONDS - time.monotonic()) if pending else None
+            try:
+                item = results_queue.get(timeout=timeout)
+                if item is None:
+                    stopped = True
+                else:
+                    index, metadata = item
+                    all_metadata[index] = metadata
+                    self._completed_count += 1
+                    completed = self._completed_count
+                    if output_file:
+                        if not pending:
+                            batch_started = time.monotonic()
+                        pending.append(metadata)
+            except queue.Empty:
+                pass
+            
+            if pending and (stopped or len(pending) >= _PARTIAL_BATCH_SIZE
+                            or time.monotonic() - batch_started >= _PARTIAL_FLUSH_SECONDS):
+                self._append_partial(pending, output_file)
+                _log(f"  Progress saved ({completed}/{len(all_metadata)})")
+                pending = []
+    
+    @staticmethod
+    def _partial_path(output_file: str) -> str:
+        # splitext, not str.replace: a name without '.json' must not map to itself
+        return os.path.splitext(output_file)[0] + '_partial.jsonl'
+    
+    def _append_partial(self, batch: List[Dict], output_file: str):
+        """Append a batch of results to the progress checkpoint, one JSON object per line."""
+        data = b''.join(_jsonl_line(record) for record in batch)
+        with self._file_save_lock:
+            with open(self._partial_path(output_file), 'ab') as f:
+                f.write(data)
+    
+    def _extract_via_http(self, video_url: str) -> Optional[Dict]:
+        """
+        Build the metadata dict from a browserless fetch of the video page.
+        
+        Returns:
+            Metadata dictionary, or None if the page needs a real browser
+        """
+        self._pace_request()
+        item = _try_http_fetch(video_url)
+        if item is None:
+            return None
+        
+        stats = item['stats']
+        author = item.get('author')
+        if isinstance(author, dict):
+            author = author.get('uniqueId')
+        description = item.get('desc') or None
+        challenge_tags = ' '.join(f"#{c.get('title')}" for c in item.get('challenges') or [] if isinstance(c, dict))
+        metadata = {
+            'url': video_url,
+            'title': description[:100] if description else None,
+            'description': description,
+            # SIGI_STATE items carry the author as a bare uniqueId string
+            'username': author if isinstance(author, str) and author else None,
+            'like_count': _to_int(stats.get('diggCount')),
+            'comment_count': _to_int(stats.get('commentCount')),
+            'share_count': _to_int(stats.get('shareCount')),
+            'view_count': _to_int(stats.get('playCount')),
+            'archive_count': _to_int(_archive_stat(stats)),
+            'hashtags': sorted(set(self._extract_hashtags_from_text(f"{description or ''} {challenge_tags}"))),
+            'error': None
+        }
+        if metadata['username'] is None:
+            username_match = _URL_USERNAME_RE.search(video_url)
+            if username_match:
+                metadata['username'] = username_match.group(1)
+        return metadata
     
     def parse_count(self, count_str: str) -> Optional[int]:
         """Parse count string like '1.2K', '5M' into integer."""
-        try:
-            count_str = count_str.upper().strip()
-            if 'K' in count_str:
-                return int(float(count_str.replace('K', '')) * 1000)
-            elif 'M' in count_str:
-                return int(float(count_str.replace('M', '')) * 1000000)
-            elif 'B' in count_str:
-                return int(float(count_str.replace('B', '')) * 1000000000)
-            else:
-                return int(float(count_str))
-        except:
+        if not isinstance(count_str, str):
             return None
+        return _parse_count(count_str)
     
     def _extract_hashtags_from_text(self, text: Optional[str]) -> List[str]:
-        """Extract unique hashtags (without #) from text."""
+        """Extract unique hashtags (without #) from text, in the order they appear."""
         if not text or not isinstance(text, str):
             return []
-        hashtags = set()
-        for match in re.findall(r'#([A-Za-z0-9_]+)', text):
-            cleaned = match.strip().lower()
-            if cleaned:
-                hashtags.add(cleaned)
-        return list(hashtags)
+        if len(text) > _HASHTAG_CACHE_MAX_TEXT:
+            # Whole-page text is unique per video; don't let it evict captions
+            return list(_hashtags_in_text.__wrapped__(text))
+        return list(_hashtags_in_text(text))
+    
+    def extract_from_links_http(self, video_links: List[str]) -> List[Optional[Dict]]:
+        """
+        Fetch every video page over plain HTTP, without starting a browser.
+        
+        Args:
+            video_links: List of TikTok video URLs
+            
+        Returns:
+            Metadata per link in input order; None where the page needs a real browser
+        """
+        results = [None] * len(video_links)
+        if not REQUESTS_AVAILABLE:
+            return results
+        
+        if len(video_links) == 1:
+            # Nothing to overlap: fetch inline, without the executor and logger thread
+            try:
+                results[0] = self._extract_via_http(video_links[0])
+            except Exception:
+                pass
+            if results[0] is not None:
+                self._log_http_progress(results[0], 1)
+            return results
+        
+        # Requests are still spaced by _pace_request; the threads only overlap the waits
+        with _background_logging(), ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            futures = {executor.submit(self._extract_via_http, url): index
+                       for index, url in enumerate(video_links)}
+            for future in as_completed(futures):
+                try:
+                    metadata = future.result()
+                except Exception:
+                    metadata = None
+                if metadata is None:
+                    continue
+                results[futures[future]] = metadata
+                self._log_http_progress(metadata, len(video_links))
+        return results
+    
+    def _log_http_progress(self, metadata: Dict, total: int):
+        """Log one video fetched by the browserless pass."""
+        current = next(self._progress_counter)
+        username, likes, views = _PROGRESS_FIELDS(metadata)
+        _log(f"[{current}/{total}] ✓ @{username} - {likes} likes, {views} views (HTTP)")
+    
+    def _extract_sequential(self, pending: List, all_metadata: List, output_file: Optional[str],
+                            try_http: bool):
+        """
+        Extract the (index, url) pairs in pending one after another on a single driver.
+        
+        The driver is a warm one borrowed from self.pool when one is attached, else
+        self.driver; either is only started once a page actually needs a browser.
+        """
+        done = []
+        with ExitStack() as stack:
+            driver = None
+            for i, (index, video_url) in enumerate(pending, 1):
+                print(f"[{i}/{len(pending)}] Processing...")
+                if self.pool is None:
+                    metadata = self.extract_metadata(video_url, try_http=try_http)
+                else:
+                    metadata = self._extract_via_http(video_url) if self.http_first and try_http else None
+                    if metadata is None:
+                        if driver is None:
+                            driver = stack.enter_context(self.pool.checkout())
+                        metadata = self.extract_metadata(video_url, driver=driver, try_http=False)
+                all_metadata[index] = metadata
+                done.append(metadata)
+                
+                # Save progress periodically
+                if i % 10 == 0 and output_file:
+                    self._append_partial(done[-10:], output_file)
+                    print(f"  Progress saved ({i}/{len(pending)})")
     
     def extract_from_links(self, video_links: List[str], output_file: str = None, use_threading: bool = True) -> List[Dict]:
         """
@@ -931,91 +1892,87 @@ class TikTokVideoMetadataExtractor:
             print("Using sequential processing (single thread)")
         print(f"{'='*60}\n")
         
-        all_metadata = []
-        self._processed_count = 0
+        all_metadata = [None] * len(video_links)  # Pre-allocate list
+        self._progress_counter = itertools.count(1)
         self._completed_count = 0
+        if output_file and os.path.exists(self._partial_path(output_file)):
+            # Checkpoints are appended, so start this run's from empty
+            os.remove(self._partial_path(output_file))
+        
+        # Browserless pass first: only the pages that don't carry their data in
+        # the initial HTML are opened in Chrome (and none are started otherwise)
+        pending = list(enumerate(video_links))
+        if self.http_first and REQUESTS_AVAILABLE:
+            all_metadata = self.extract_from_links_http(video_links)
+            pending = [(index, url) for index, url in pending if all_metadata[index] is None]
+            fetched = [m for m in all_metadata if m is not None]
+            self._completed_count = len(fetched)
+            if fetched and output_file:
+                self._append_partial(fetched, output_file)
+            print(f"\n{len(fetched)} videos fetched over HTTP, {len(pending)} need a browser\n")
+        try_http = not (self.http_first and REQUESTS_AVAILABLE)
         
-        if use_threading and len(video_links) > 1:
+        if use_threading and len(pending) > 1:
             # Multi-threaded processing
-            all_metadata = [None] * len(video_links)  # Pre-allocate list
-            
-            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-                # Submit all tasks
-                future_to_index = {
-                    executor.submit(self._process_single_video, url, i, len(video_links)): i
-                    for i, url in enumerate(video_links)
-                }
+            # One warm driver per worker, reused across videos instead of a fresh
+            # Chrome per video; dead drivers are replaced in the background
+            owns_pool = self.pool is None
+            if owns_pool:
+                self.pool = create_browser_pool(num_threads=self.num_threads, refill=True,
+                                                factory=self._create_driver)
+            try:
+                if owns_pool:
+                    print(f"Starting {self.num_threads} browsers...")
+                    self.pool.prefill(self.num_threads)
                 
-                # Process completed tasks and save progress periodically
-                for future in as_completed(future_to_index):
-                    index = future_to_index[future]
-                    try:
-                        metadata = future.result()
-                        # Thread-safe assignment (list assignment is atomic in Python)
-                        all_metadata[index] = metadata
-                        
-                        # Thread-safe counter increment and save check
-                        should_save = False
-                        with self._progress_lock:
-                            self._completed_count += 1
-                            completed = self._completed_count
-                            # Only save if we hit a milestone and no other thread is saving
-                            if completed % 10 == 0 and output_file:
-                                should_save = True
-                        
-                        # Save outside the progress lock to avoid blocking other threads
-                        if should_save:
-                            with self._file_save_lock:
-                                # Filter out None values for partial save
-                                completed_metadata = [m for m in all_metadata if m is not None]
-                                self.save_results(completed_metadata, output_file, partial=True)
-                                print(f"  Progress saved ({completed}/{len(video_links)})")
-                                
-                    except Exception as e:
-                        error_msg = str(e)
-                        print(f"  ✗ Thread error for index {index}: {error_msg}")
-                        all_metadata[index] = {
-                            'url': video_links[index] if index < len(video_links) else 'unknown',
-                            'title': None,
-                            'description': None,
-                            'username': None,
-                            'like_count': None,
-                            'comment_count': None,
-                            'share_count': None,
-                            'view_count': None,
-                            'archive_count': None,
-                            'hashtags': [],
-                            'error': error_msg
-                        }
-                        # Still increment counter on error
-                        with self._progress_lock:
-                            self._completed_count += 1
-        else:
-            # Sequential processing (fallback or single video)
-            if not self.driver:
-                self.setup_driver()
-        
-        try:
-            for i, video_url in enumerate(video_links, 1):
-                print(f"[{i}/{len(video_links)}] Processing...")
-                metadata = self.extract_metadata(video_url)
-                all_metadata.append(metadata)
+                # Long-lived workers pull URLs from a shared queue, so a worker whose
+                # driver finishes early immediately takes the next URL; a separate
+                # writer thread merges results and does the periodic saves
+                url_queue = queue.SimpleQueue()
+                for index, url in pending:
+                    url_queue.put((index, url))
+                for _ in range(self.num_threads):
+                    url_queue.put(None)  # One stop signal per worker
+                results_queue = queue.SimpleQueue()
                 
-                # Save progress periodically
-                if i % 10 == 0 and output_file:
-                    self.save_results(all_metadata, output_file, partial=True)
-                    print(f"  Progress saved ({i}/{len(video_links)})")
-        finally:
-            if self.driver:
-                self.driver.quit()
+                with _background_logging():
+                    writer = Thread(
+                        target=self._collect_results,
+                        args=(results_queue, all_metadata, output_file),
+                    )
+                    writer.start()
+                    workers = [
+                        Thread(
+                            target=self._extraction_worker,
+                            args=(thread_id, url_queue, results_queue, len(video_links), try_http),
+                        )
+                        for thread_id in range(1, self.num_threads + 1)
+                    ]
+                    for worker in workers:
+                        worker.start()
+                    for worker in workers:
+                        worker.join()
+                    results_queue.put(None)
+                    writer.join()
+            finally:
+                if owns_pool:
+                    self.pool.close()
+                    self.pool = None
+        elif pending:
+            # Sequential processing (fallback or single video): no worker or writer
+            # threads, and an attached pool's warm driver is borrowed over a new Chrome
+            try:
+                self._extract_sequential(pending, all_metadata, output_file, try_http)
+            finally:
+                if self.pool is None and self.driver:
+                    self.driver.quit()
         
         # Filter out None values (shouldn't happen, but safety check)
         all_metadata = [m for m in all_metadata if m is not None]
         
         # Save final results (thread-safe)
         if output_file:
-                self.save_results(all_metadata, output_file)
-                self.save_results(all_metadata, output_file)
+            self.save_results(all_metadata, output_file)
         
         return all_metadata
     
@@ -1024,33 +1981,12 @@ class TikTokVideoMetadataExtractor:
         Save metadata results to JSON file (thread-safe).
         Note: This method should be called with _file_save_lock when used in threaded context.
         """
-        suffix = "_partial" if partial else ""
-        file_path = output_file.replace('.json', f'{suffix}.json') if partial else output_file
+        root, ext = os.path.splitext(output_file)
+        file_path = f"{root}_partial{ext}" if partial else output_file
         
         for video in metadata:
-            if not isinstance(video, dict):
-                continue
-            if video.get('archive_count') is not None:
-                try:
-                    video['archive_count'] = int(video['archive_count'])
-                except (ValueError, TypeError):
-                    video['archive_count'] = None
-            hashtags = video.get('hashtags')
-            if hashtags is None:
-                video['hashtags'] = []
-            elif isinstance(hashtags, list):
-                cleaned = []
-                seen = set()
-                for tag in hashtags:
-                    if not isinstance(tag, str):
-                        continue
-                    cleaned_tag = tag.lstrip('#').lower()
-                    if cleaned_tag and cleaned_tag not in seen:
-                        seen.add(cleaned_tag)
-                        cleaned.append(cleaned_tag)
-                video['hashtags'] = cleaned
-            else:
-                video['hashtags'] = []
+            if isinstance(video, dict):
+                _normalize_video(video)
         
         result = {
             'total_videos': len(metadata),
@@ -1061,8 +1997,8 @@ class TikTokVideoMetadataExtractor:
         # Use atomic write: write to temp file first, then rename
         temp_file = file_path + '.tmp'
         try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            with open(temp_file, 'wb') as f:
+                f.write(_dumps_indented(result))
             # Atomic rename (works on Unix and Windows)
             if os.path.exists(file_path):
                 os.replace(temp_file, file_path)
@@ -1073,14 +2009,146 @@ class TikTokVideoMetadataExtractor:
             try:
                 if os.path.exists(temp_file):
                     os.remove(temp_file)
-            except:
+            except OSError:
                 pass
             raise e
 
     
+    def save_results_from_partial(self, output_file: str) -> int:
+        """
+        Build output_file from the run's _partial.jsonl checkpoint, one record at a time.
+        
+        Writes the same document as save_results (same keys, same order) without
+        holding the run in memory as one list or encoding it in one piece.
+        
+        Returns:
+            Number of videos written
+        """
+        partial_path = self._partial_path(output_file)
+        
+        def _videos(src):
+            for line in src:
+                video = _loads_or_none(line) if line.strip() else None
+                if isinstance(video, dict):  # Skip blank or torn lines from an interrupted run
+                    yield video
+        
+        # total_videos leads the document, so count the records in a first pass
+        with open(partial_path, 'rb') as src:
+            total = sum(1 for _ in _videos(src))
+        
+        temp_file = output_file + '.tmp'
+        count = 0
+        try:
+            with open(partial_path, 'rb') as src, open(temp_file, 'wb') as dst:
+                dst.write(b'{\n  "total_videos": ' + str(total).encode()
+                          + b',\n  "extracted_at": ' + _dumps_indented(time.strftime('%Y-%m-%d %H:%M:%S'))
+                          + b',\n  "videos": [')
+                for video in _videos(src):
+                    if count == total:
+                        break  # Lines appended after the count was taken
+                    body = _dumps_indented(_normalize_video(video)).replace(b'\n', b'\n    ')
+                    dst.write((b',\n    ' if count else b'\n    ') + body)
+                    count += 1
+                dst.write((b'\n  ]' if count else b']') + b'\n}')
+            os.replace(temp_file, output_file)
+        except Exception:
+            # Clean up temp file on error
+            try:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        return count
+    
+    def _resume_partial(self, output_file: str) -> set:
+        """
+        Trim a previous run's checkpoint to its successful records and return their URLs.
+        
+        A resumed run skips those URLs, keeps their records for the final output,
+        and retries everything that failed or never finished.
+        """
+        partial_path = self._partial_path(output_file)
+        if not os.path.exists(partial_path):
+            return set()
+        done = set()
+        temp_file = partial_path + '.tmp'
+        with open(partial_path, 'rb') as src, open(temp_file, 'wb') as dst:
+            for line in src:
+                record = _loads_or_none(line) if line.strip() else None
+                if not isinstance(record, dict) or record.get('error'):
+                    continue
+                url = record.get('url')
+                if url and url not in done:
+                    done.add(url)
+                    dst.write(line if line.endswith(b'\n') else line + b'\n')
+        os.replace(temp_file, partial_path)
+        return done
+    
+    def extract_links_to_file(self, video_links: List[str], output_file: str, gate: Optional[RateGate] = None,
+                              keep_results: bool = False, resume: bool = False) -> Dict:
+        """
+        Extract video_links on drivers from self.pool, one task per video.
+        
+        Each result is appended to the _partial.jsonl checkpoint as soon as it
+        completes, and output_file is built from that checkpoint at the end, so
+        the run doesn't accumulate in memory unless keep_results is set.
+        
+        Args:
+            video_links: List of TikTok video URLs
+            output_file: Output JSON file path
+            gate: Optional RateGate shared by the workers
+            keep_results: Also return every metadata dict
+            resume: Skip links a previous run's checkpoint already holds a
+                successful result for, and keep those results in output_file
+            
+        Returns:
+            Dictionary with 'total', 'successful', 'samples' (up to 3 successful
+            results) and 'results' (every result with keep_results, else None)
+            for this run, plus 'resumed' (results carried over from the checkpoint)
+        """
+        summary = {'total': 0, 'successful': 0, 'samples': [], 'results': [] if keep_results else None,
+                   'resumed': 0}
+        partial_path = self._partial_path(output_file)
+        if resume:
+            done = self._resume_partial(output_file)
+            if done:
+                video_links = [url for url in video_links if url not in done]
+                summary['resumed'] = len(done)
+                print(f"Resuming: {len(done)} videos already extracted, {len(video_links)} left")
+        elif os.path.exists(partial_path):
+            # Checkpoints are appended, so start this run's from empty
+            os.remove(partial_path)
+        self._progress_counter = itertools.count(1)
+        # Parks workers while extra ones only lower throughput (e.g. more Chromes than cores)
+        admission = ConcurrencyGate(self.num_threads) if self.num_threads > 1 else None
+        
+        # An idle worker always takes the next link, so a slow page never holds
+        # up links queued behind it
+        with _background_logging(), \
+                ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix='extract') as executor, \
+                open(partial_path, 'ab') as checkpoint:
+            futures = [
+                executor.submit(_extract_one, self, video_url, index, len(video_links), gate, admission)
+                for index, video_url in enumerate(video_links, 1)
+            ]
+            for future in as_completed(futures):
+                metadata = future.result()
+                checkpoint.write(_jsonl_line(metadata))
+                summary['total'] += 1
+                if not metadata.get('error'):
+                    summary['successful'] += 1
+                    if len(summary['samples']) < 3:
+                        summary['samples'].append(metadata)
+                if keep_results:
+                    summary['results'].append(metadata)
+        
+        self.save_results_from_partial(output_file)
+        return summary
+    
     def finalize_and_retry_errors(self, output_file: str) -> Dict:
         """
-        Check output file for items with errors and re-crawl them in single-threaded mode.
+        Check output file for items with errors and re-crawl them on a few parallel browsers.
         
         Args:
             output_file: Path to the output JSON file to check and update
@@ -1098,8 +2166,12 @@ class TikTokVideoMetadataExtractor:
             return {'retried': 0, 'successful': 0, 'still_failed': 0}
         
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if ORJSON_AVAILABLE:
+                with open(output_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(output_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
         except Exception as e:
             print(f"Error loading output file: {e}")
             return {'retried': 0, 'successful': 0, 'still_failed': 0}
@@ -1113,78 +2185,64 @@ class TikTokVideoMetadataExtractor:
             print("Error: Unexpected JSON structure")
             return {'retried': 0, 'successful': 0, 'still_failed': 0}
         
-        # Find videos with errors
-        failed_videos = [v for v in videos if v.get('error') is not None and v.get('error') != '']
+        # One pass over the output: map each failed URL to the entries it appears
+        # at, so successful rows are never indexed and repeats are retried once
+        failed_indexes = defaultdict(list)
+        failed_count = 0
+        for idx, video in enumerate(videos):
+            if video.get('error'):
+                failed_count += 1
+                if video.get('url'):
+                    failed_indexes[video['url']].append(idx)
         
-        if not failed_videos:
+        if not failed_count:
             print("✓ No errors found in output file. All extractions were successful!")
             return {'retried': 0, 'successful': 0, 'still_failed': 0}
         
-        print(f"Found {len(failed_videos)} videos with errors. Retrying in single-threaded mode...\n")
-        
-        # Extract URLs of failed videos
-        failed_urls = [v.get('url') for v in failed_videos if v.get('url')]
+        print(f"Found {failed_count} videos with errors. Retrying...\n")
         
+        failed_urls = list(failed_indexes)
         if not failed_urls:
             print("No valid URLs found in failed videos.")
             return {'retried': 0, 'successful': 0, 'still_failed': 0}
         
-        # Create a mapping of URL to index in the videos list for easy updates
-        url_to_index = {}
-        for idx, video in enumerate(videos):
-            url = video.get('url')
-            if url:
-                url_to_index[url] = idx
-        
-        # Re-extract metadata in single-threaded mode (more reliable for retries)
-        print("Retrying failed extractions (single-threaded mode)...")
+        # Re-extract on at most 4 pooled browsers: failures are often rate-limit
+        # related, so keep the retry pass gentler than the main run
+        retry_threads = max(1, min(self.num_threads, 4))
+        print(f"Retrying failed extractions ({retry_threads} threads)...")
         successful_retries = 0
         still_failed = 0
         
-        # Setup driver for sequential processing
-        if not self.driver:
-            self.setup_driver()
+        owns_pool = self.pool is None
+        if owns_pool:
+            self.pool = create_browser_pool(num_threads=retry_threads, refill=True,
+                                            factory=self._create_driver)
+        self._progress_counter = itertools.count(1)
         
         try:
-            for i, url in enumerate(failed_urls, 1):
-                print(f"\n[{i}/{len(failed_urls)}] Retrying: {url}")
-                try:
-                    # Extract metadata using sequential mode
-                    new_metadata = self.extract_metadata(url)
+            with _background_logging(), ThreadPoolExecutor(max_workers=retry_threads) as executor:
+                future_to_url = {
+                    executor.submit(self._process_single_video, url, i, len(failed_urls)): url
+                    for i, url in enumerate(failed_urls, 1)
+                }
+                for future in as_completed(future_to_url):
+                    url = future_to_url[future]
+                    # _process_single_video turns extraction failures into an error entry
+                    new_metadata = future.result()
                     
-                    # Update the corresponding entry in the videos list
-                    if url in url_to_index:
-                        idx = url_to_index[url]
-                        # Preserve the original entry but update with new data
+                    # Replace every failed entry for this URL with the new data
+                    for idx in failed_indexes[url]:
                         videos[idx] = new_metadata
-                        
-                        if new_metadata.get('error'):
-                            still_failed += 1
-                            print(f"  ✗ Still failed: {new_metadata.get('error')}")
-                        else:
-                            successful_retries += 1
-                            print(f"  ✓ Successfully retried!")
+                    
+                    if new_metadata.get('error'):
+                        still_failed += 1
                     else:
-                        # URL not found in mapping, append as new entry
-                        videos.append(new_metadata)
-                        if not new_metadata.get('error'):
-                            successful_retries += 1
-                        else:
-                            still_failed += 1
-                            
-                except Exception as e:
-                    print(f"  ✗ Error during retry: {e}")
-                    still_failed += 1
-                    # Update error message
-                    if url in url_to_index:
-                        idx = url_to_index[url]
-                        videos[idx]['error'] = f"Retry failed: {str(e)}"
+                        successful_retries += 1
         
         finally:
-            # Clean up driver
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+            if owns_pool:
+                self.pool.close()
+                self.pool = None
         
         # Update the data structure
         is_dict_format = isinstance(data, dict)
@@ -1220,9 +2278,24 @@ class TikTokVideoMetadataExtractor:
         }
 
 def load_links_from_json(json_file: str) -> List[str]:
-    """Load video links from crawler output JSON file."""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    """Load video links from crawler output JSON file (plain or .json.gz)."""
+    if json_file.endswith('.gz'):
+        with gzip.open(json_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    elif ORJSON_AVAILABLE:
+        # Parse straight from the mapped file, without an intermediate bytes copy
+        with open(json_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    data = orjson.loads(view)
+                finally:
+                    # The map can't be closed while a view of it is alive
+                    view.release()
+    else:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     
     # Handle different JSON structures
     if isinstance(data, dict):
@@ -1235,73 +2308,38 @@ def load_links_from_json(json_file: str) -> List[str]:
     
     return []
 
-def _process_chunk_in_thread(chunk_links: List[str], thread_id: int, headless: bool, delay: float, results_list: List[Dict], results_lock: Lock):
+def _extract_one(extractor: TikTokVideoMetadataExtractor, video_url: str, index: int, total: int,
+                 gate: Optional[RateGate] = None, admission: Optional[ConcurrencyGate] = None) -> Dict:
     """
-    Process a chunk of video links in a separate thread with its own extractor instance.
+    Extract one video on a driver checked out of extractor.pool (one executor task).
     
     Args:
-        chunk_links: List of video URLs to process in this thread
-        thread_id: Identifier for this thread (for logging)
-        headless: Whether to run browser in headless mode
-        delay: Delay between requests
-        results_list: Shared list to store results (thread-safe)
-        results_lock: Lock for thread-safe access to results_list
+        extractor: Extractor shared by all workers; its pool supplies the drivers
+        video_url: URL of the video to process
+        index: Position of the video (for progress output)
+        total: Total number of videos
+        gate: Optional RateGate shared by all workers; backs off only once
+            throttling is observed
+        admission: Optional ConcurrencyGate that may park this worker while
+            throughput shows the machine is oversubscribed
+        
+    Returns:
+        Metadata dictionary (with 'error' set instead of raising)
     """
-    print(f"Thread {thread_id}: Starting to process {len(chunk_links)} videos")
-    
-    # Create a separate extractor instance for this thread
-    extractor = TikTokVideoMetadataExtractor(
-        headless=headless,
-        delay=delay,
-        num_threads=1  # Each thread processes sequentially within its own instance
-    )
-    
-    driver = None
-    try:
-        # Stagger driver creation to avoid simultaneous Chrome launches
-        # Each thread waits a bit longer to reduce resource contention
-        stagger_delay = (thread_id - 1) * 2.0  # 0s, 2s, 4s, etc.
-        if stagger_delay > 0:
-            print(f"Thread {thread_id}: Waiting {stagger_delay}s before creating driver...")
-            time.sleep(stagger_delay)
-        
-        # Create a driver for this thread using the robust _create_driver method
-        print(f"Thread {thread_id}: Creating browser driver...")
-        driver = extractor._create_driver()
-        print(f"Thread {thread_id}: Browser driver created successfully")
-        
-        # Process each link sequentially in this thread
-        for i, video_url in enumerate(chunk_links, 1):
-            print(f"Thread {thread_id}: [{i}/{len(chunk_links)}] Processing {video_url}")
-            # Pass the driver to extract_metadata to avoid creating new instances
-            metadata = extractor.extract_metadata(video_url, driver=driver)
-            
-            # Thread-safe append to results
-            with results_lock:
-                results_list.append(metadata)
-            
-            # Print progress
-            username = metadata.get('username', 'N/A')
-            likes = metadata.get('like_count', 'N/A')
-            views = metadata.get('view_count', 'N/A')
-            print(f"Thread {thread_id}: [{i}/{len(chunk_links)}] ✓ @{username} - {likes} likes, {views} views")
-            time.sleep(1)
-    except Exception as e:
-        print(f"Thread {thread_id}: Error during processing: {e}")
-        import traceback
-        traceback.print_exc()
-    finally:
-        # Clean up driver if it exists
-        if driver:
-            try:
-                driver.quit()
-            except:
-                try:
-                    driver.close()
-                except:
-                    pass
-    
-    print(f"Thread {thread_id}: Completed processing {len(chunk_links)} videos")
+    if gate is not None:
+        gate.wait()
+    if admission is not None:
+        with admission.slot():
+            metadata = extractor._process_single_video(video_url, index, total)
+    else:
+        metadata = extractor._process_single_video(video_url, index, total)
+    if gate is not None:
+        if _looks_throttled(metadata):
+            _log(f"  Possible rate limiting at {video_url}, backing off")
+            gate.record_throttle()
+        else:
+            gate.record_success()
+    return metadata
 
 def main():
     import argparse
@@ -1322,10 +2360,21 @@ def main():
     parser.add_argument('--limit', type=int, default=None,
                        help='Limit number of videos to process')
     parser.add_argument('--finalize', action='store_true',
-                       help='Check output file for errors and retry failed extractions in single-threaded mode')
+                       help='Check output file for errors and retry failed extractions')
+    parser.add_argument('--pin-cpus', action='store_true',
+                       help='Give each browser its own share of the CPU cores (Linux only)')
+    parser.add_argument('--resume', action='store_true',
+                       help="Skip videos the previous run's progress file already has results for")
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Log full tracebacks for errors')
     
     args = parser.parse_args()
     
+    # Tracebacks are logged at DEBUG, so they only cost anything with --verbose
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s t=%(threadName)s %(message)s')
+    if args.verbose:
+        log.setLevel(logging.DEBUG)  # Not the root logger: selenium / urllib3 are very chatty at DEBUG
+    
     if not SELENIUM_AVAILABLE:
         print("ERROR: Please install required packages:")
         print("  pip install undetected-chromedriver selenium")
@@ -1355,6 +2404,8 @@ def main():
     # Determine output file
     if not args.output:
         input_path = Path(args.input)
+        if input_path.suffix == '.gz':
+            input_path = input_path.with_suffix('')
         args.output = str(input_path.parent / f"{input_path.stem}_metadata.json")
     
     # Load video links
@@ -1372,85 +2423,60 @@ def main():
             print("No video links found in input file!")
             return
         
-        # Create extractor instance for finalize if needed (will be created later if not finalizing)
-        extractor = None
-        
-        # Divide video_links into 5 chunks
-        num_threads = args.threads
-        chunk_size = len(video_links) // num_threads
-        remainder = len(video_links) % num_threads
-        
-        chunks = []
-        start_idx = 0
-        for i in range(num_threads):
-            # Distribute remainder across first few chunks
-            current_chunk_size = chunk_size + (1 if i < remainder else 0)
-            end_idx = start_idx + current_chunk_size
-            chunks.append(video_links[start_idx:end_idx])
-            start_idx = end_idx
-        
-        print(f"\n{'='*60}")
-        print(f"Dividing {len(video_links)} videos into {num_threads} threads:")
-        for i, chunk in enumerate(chunks, 1):
-            print(f"  Thread {i}: {len(chunk)} videos")
-        print(f"{'='*60}\n")
-        
-        # Create shared results list and lock
-        all_metadata = []
-        results_lock = Lock()
-        
-        # Create and start 5 threads, each with its own extractor instance
-        threads = []
-        for thread_id in range(1, num_threads + 1):
-            if len(chunks[thread_id - 1]) > 0:  # Only create thread if chunk is not empty
-                thread = Thread(
-                    target=_process_chunk_in_thread,
-                    args=(
-                        chunks[thread_id - 1],
-                        thread_id,
-                        args.headless,
-                        args.delay,
-                        all_metadata,
-                        results_lock
-                    )
-                )
-                threads.append(thread)
-                thread.start()
-                # Small delay between thread starts to avoid simultaneous driver creation
-                time.sleep(1.5)
-        # Wait for all threads to complete
-        print(f"\nWaiting for all {len(threads)} threads to complete...")
-        for thread in threads:
-            thread.join()
-        
-        print(f"\nAll threads completed. Total results: {len(all_metadata)}")
-        
-        # Save results
-        if args.output:
+        if args.no_threading or (len(video_links) == 1 and not args.resume):
+            # A single video (or --no-threading) runs inline: no browser pool,
+            # worker threads or logger thread to start for one blocking call
             extractor = TikTokVideoMetadataExtractor(
                 headless=args.headless,
                 delay=args.delay,
                 num_threads=1
             )
-            extractor.save_results(all_metadata, args.output)
-        
-        metadata = all_metadata
+            all_metadata = extractor.extract_from_links(video_links, args.output, use_threading=False)
+            summary = {'total': len(all_metadata), 'successful': 0, 'samples': [], 'resumed': 0}
+            for m in all_metadata:
+                if not m.get('error'):
+                    summary['successful'] += 1
+                    if len(summary['samples']) < 3:
+                        summary['samples'].append(m)
+        else:
+            num_threads = args.threads
+            # One bounded pool of warm browsers shared by every worker instead of a
+            # Chrome launched (and quit) per thread; drained once all videos are done
+            extractor = TikTokVideoMetadataExtractor(
+                headless=args.headless,
+                delay=args.delay,
+                num_threads=num_threads,
+                pin_cpus=args.pin_cpus
+            )
+            extractor.pool = create_browser_pool(num_threads=num_threads, factory=extractor._create_driver)
+            gate = RateGate()
+            
+            print(f"\n{'='*60}")
+            print(f"Extracting {len(video_links)} videos on {num_threads} threads")
+            print(f"{'='*60}\n")
+            try:
+                summary = extractor.extract_links_to_file(video_links, args.output, gate, resume=args.resume)
+            finally:
+                extractor.pool.close()
+                extractor.pool = None
+            
+            print(f"\nAll threads completed. Total results: {summary['total']}")
         
         # Print summary
         print(f"\n{'='*60}")
         print("Extraction Summary:")
         print(f"{'='*60}")
-        print(f"Total videos processed: {len(metadata)}")
-        successful = sum(1 for m in metadata if not m.get('error'))
-        print(f"Successfully extracted: {successful}")
-        print(f"Errors: {len(metadata) - successful}")
+        print(f"Total videos processed: {summary['total']}")
+        if summary['resumed']:
+            print(f"Carried over from previous run: {summary['resumed']}")
+        print(f"Successfully extracted: {summary['successful']}")
+        print(f"Errors: {summary['total'] - summary['successful']}")
         print(f"\nResults saved to: {args.output}")
         
         # Show sample
-        if metadata:
+        if summary['samples']:
             print("\nSample extracted data:")
-            sample = [m for m in metadata if not m.get('error')][:3]
-            for m in sample:
+            for m in summary['samples']:
                 title = m.get('title') or 'N/A'
                 title_display = title[:50] + '...' if isinstance(title, str) and len(title) > 50 else title
                 print(f"  - @{m.get('username', 'N/A')}: {title_display}")
@@ -1458,12 +2484,6 @@ def main():
         
         # Finalize: retry errors if requested
         if args.finalize:
-            if not extractor:
-                extractor = TikTokVideoMetadataExtractor(
-                    headless=args.headless,
-                    delay=args.delay,
-                    num_threads=1
-                )
             extractor.finalize_and_retry_errors(args.output)
     
     except FileNotFoundError:
@@ -1471,8 +2491,7 @@ def main():
         print("Please run the crawler first to generate video links.")
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.debug("Extraction failed", exc_info=True)
 
 
 if __name__ == '__main__':